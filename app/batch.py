@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import traceback
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .store import StoredOutput, store
+from .wav_assembly import read_wav_layout
+
+# Multi-document requests answered as one ZIP. Documents are synthesized
+# concurrently (each still waits for scheduler slots like any /synthesize
+# request) and every result is added to the archive as soon as it finishes,
+# so the response starts early and is never held in memory. manifest.json,
+# written last, lists every document with its timings or error.
+
+_BLOCK = 256 * 1024
+
+
+@dataclass
+class BatchItem:
+    index: int
+    filename: str
+    path: Path  # saved upload
+    sha256: str
+    size: int
+    status: str = "pending"  # pending | done | error
+    archive_name: Optional[str] = None
+    cache: Optional[str] = None  # hit | miss
+    started_s: Optional[float] = None  # offsets from the start of the batch
+    finished_s: Optional[float] = None
+    audio_s: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "filename": self.filename,
+            "sha256": self.sha256,
+            "size_bytes": self.size,
+            "status": self.status,
+            "file": self.archive_name,
+            "cache": self.cache,
+            "started_s": self.started_s,
+            "finished_s": self.finished_s,
+            "elapsed_s": (
+                round(self.finished_s - self.started_s, 3)
+                if self.started_s is not None and self.finished_s is not None
+                else None
+            ),
+            "audio_s": self.audio_s,
+            "error": self.error,
+        }
+
+
+class _ZipSink:
+    """Write-only file object; the archive bytes are collected for the response."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+@dataclass
+class Batch:
+    id: str
+    items: list[BatchItem]
+    options: dict = field(default_factory=dict)  # shared parameters, echoed in the manifest
+
+    def iter_zip(
+        self,
+        synthesize: Callable[[BatchItem], tuple[StoredOutput, bool]],
+        concurrency: int,
+        cleanup: Optional[Callable[[], None]] = None,
+    ) -> Iterator[bytes]:
+        """Run `synthesize` on every item and yield the ZIP as results complete.
+
+        `synthesize` returns pinned store entries (see synthesize_to_store); each
+        is released once it has been copied into the archive. `cleanup` runs
+        once no document of the batch is running any more, which may be after
+        the generator is closed (closing never waits for running documents).
+        """
+        t0 = time.perf_counter()
+
+        def run(item: BatchItem) -> tuple[StoredOutput, bool]:
+            item.started_s = round(time.perf_counter() - t0, 3)
+            try:
+                return synthesize(item)
+            finally:
+                item.finished_s = round(time.perf_counter() - t0, 3)
+
+        sink = _ZipSink()
+        pool = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(self.items))), thread_name_prefix="batch")
+        try:
+            pending: dict[Future, BatchItem] = {pool.submit(run, item): item for item in self.items}
+            with zipfile.ZipFile(sink, "w") as zf:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        item = pending.pop(fut)
+                        try:
+                            stored, hit = fut.result()
+                        except Exception as e:
+                            traceback.print_exc()
+                            item.status = "error"
+                            item.error = str(e) or e.__class__.__name__
+                            continue
+                        try:
+                            item.cache = "hit" if hit else "miss"
+                            item.archive_name = f"{item.index:03d}_{Path(item.filename).stem}{stored.path.suffix}"
+                            if stored.path.suffix == ".wav":
+                                item.audio_s = round(read_wav_layout(stored.path).seconds, 3)
+                            yield from self._add_file(zf, sink, item.archive_name, stored.path)
+                        finally:
+                            store.release(stored.key)
+                        item.status = "done"
+                manifest = {
+                    "batch": self.id,
+                    "options": self.options,
+                    "wall_s": round(time.perf_counter() - t0, 3),
+                    "documents": [item.to_dict() for item in self.items],
+                }
+                zf.writestr(
+                    zipfile.ZipInfo("manifest.json", time.localtime()[:6]),
+                    json.dumps(manifest, indent=2, ensure_ascii=False),
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+            yield sink.drain()
+        finally:
+            # Client gone or done: drop documents that have not started; running
+            # ones finish into the store in the background (so a retried batch is
+            # served from it) and release their pins as they do. The generator
+            # may be closed on the event loop, so nothing here waits for them.
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._after_running([fut for fut in pending if not fut.cancelled()], cleanup)
+
+    @staticmethod
+    def _after_running(running: list[Future], cleanup: Optional[Callable[[], None]]) -> None:
+        remaining = [len(running)]
+        lock = threading.Lock()
+
+        def finished(fut: Future) -> None:
+            if not fut.cancelled() and fut.exception() is None:
+                store.release(fut.result()[0].key)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and cleanup is not None:
+                cleanup()
+
+        if not running:
+            if cleanup is not None:
+                cleanup()
+            return
+        for fut in running:
+            fut.add_done_callback(finished)
+
+    @staticmethod
+    def _add_file(zf: zipfile.ZipFile, sink: _ZipSink, name: str, path: Path) -> Iterator[bytes]:
+        # Audio barely compresses; stored entries cost no CPU
+        info = zipfile.ZipInfo.from_file(path, arcname=name)
+        info.compress_type = zipfile.ZIP_STORED
+        with path.open("rb") as src, zf.open(info, "w", force_zip64=info.file_size > 0x7FFFFFFF) as dst:
+            while True:
+                block = src.read(_BLOCK)
+                if not block:
+                    break
+                dst.write(block)
+                data = sink.drain()
+                if data:
+                    yield data
+        data = sink.drain()
+        if data:
+            yield data
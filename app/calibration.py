@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .wav_assembly import read_wav_layout
+
+# Per-backend chunk-size profiles. `scripts/calibrate_chunks.py` times each
+# installed backend on a fixed corpus at several chunk lengths and fits
+#     seconds(chunk) = overhead_s + per_char_s * chars
+# The pipeline then picks `max_chars` from the fit when the caller leaves it
+# unset (CHUNK_MODE: "throughput" = lowest total time, "latency" = lowest
+# time to first audio that still keeps ahead of playback, "fixed" = 1500).
+
+DEFAULT_MAX_CHARS = 1500
+CHUNK_MODES = ("throughput", "latency", "fixed")
+CALIBRATION_LENGTHS = (100, 200, 400, 800, 1500)
+
+# Fixed corpus so profiles from different machines are comparable
+CORPUS = [
+    "La lecture de documents longs demande une voix claire et régulière.",
+    "Les résultats du trimestre montrent une progression de douze pour cent par rapport à l'année précédente.",
+    "Chaque paragraphe est découpé en blocs avant la synthèse, puis les blocs sont assemblés dans un seul fichier.",
+    "Le comité se réunira mardi prochain afin d'examiner les propositions reçues.",
+    "Il faut environ vingt minutes pour rejoindre la gare à pied depuis le centre historique.",
+    "Cette méthode reste simple, mais elle suppose que les données soient propres et complètes.",
+    "Plusieurs lecteurs ont signalé des erreurs dans la deuxième édition, corrigées depuis.",
+    "En conclusion, les coûts fixes pèsent davantage sur les petits volumes que sur les grands.",
+]
+
+
+@dataclass
+class ChunkProfile:
+    backend: str
+    overhead_s: float  # fixed cost per synthesis call
+    per_char_s: float  # marginal cost per character
+    audio_per_char_s: float  # seconds of speech produced per character
+    first_audio_s: Optional[float]  # median time to first audio (streaming backends)
+    min_chars: int  # calibrated range; choices never leave it
+    max_chars: int
+    samples: int
+    host: str = ""
+    measured_at: float = 0.0
+
+    def seconds(self, chars: int) -> float:
+        return self.overhead_s + self.per_char_s * chars
+
+    def choose(self, mode: str) -> int:
+        """Chunk length for `mode` ("throughput" or "latency") within the calibrated range."""
+        lo, hi = self.min_chars, self.max_chars
+        if self.per_char_s <= 0:
+            return hi  # cost does not grow with length: fewest calls wins
+        if mode == "latency":
+            # Smallest chunk whose synthesis still finishes before the previous
+            # chunk has been played (no gaps after the first audio)
+            margin = self.audio_per_char_s - self.per_char_s
+            if margin <= 0:
+                return lo  # slower than real time anyway: only the first wait can shrink
+            target = self.overhead_s / margin
+        else:
+            # Total time is chars * (per_char + overhead / chunk): past the point
+            # where the overhead is 5% of a call, longer chunks gain little and
+            # only delay the first audio
+            target = 19.0 * self.overhead_s / self.per_char_s
+        return int(min(hi, max(lo, round(target))))
+
+
+def fit(samples: list[tuple[int, float]]) -> tuple[float, float]:
+    """Least-squares (overhead_s, per_char_s) for (chars, seconds) samples."""
+    n = len(samples)
+    if n == 0:
+        raise ValueError("No samples to fit")
+    mean_x = sum(x for x, _ in samples) / n
+    mean_y = sum(y for _, y in samples) / n
+    var = sum((x - mean_x) ** 2 for x, _ in samples)
+    if var == 0:
+        return 0.0, mean_y / mean_x if mean_x else 0.0
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / var
+    slope = max(slope, 0.0)
+    return max(mean_y - slope * mean_x, 0.0), slope
+
+
+def corpus_text(chars: int) -> str:
+    """Whole corpus sentences, cycled, up to about `chars` characters."""
+    parts: list[str] = []
+    size, i = 0, 0
+    while not parts or size + len(CORPUS[i % len(CORPUS)]) + 1 <= chars:
+        s = CORPUS[i % len(CORPUS)]
+        parts.append(s)
+        size += len(s) + 1
+        i += 1
+    return " ".join(parts)
+
+
+def load_profiles(path: str | Path | None = None) -> dict[str, ChunkProfile]:
+    p = Path(path or settings.calibration_file)
+    try:
+        raw = json.loads(p.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Ignoring unreadable calibration file {p}: {e}")
+        return {}
+    return {name: ChunkProfile(**entry) for name, entry in raw.items()}
+
+
+def save_profiles(profiles: dict[str, ChunkProfile], path: str | Path | None = None) -> Path:
+    p = Path(path or settings.calibration_file)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(p.suffix + ".tmp")
+    tmp.write_text(json.dumps({k: asdict(v) for k, v in profiles.items()}, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+    return p
+
+
+def resolve_max_chars(backend: str, max_chars: Optional[int], mode: Optional[str] = None) -> int:
+    """`max_chars` if given, else the calibrated choice for `backend`, else the default."""
+    if max_chars is not None:
+        return max_chars
+    mode = (mode or settings.chunk_mode).lower()
+    if mode not in CHUNK_MODES:
+        raise ValueError(f"chunk_mode must be one of {', '.join(CHUNK_MODES)}")
+    if mode == "fixed":
+        return DEFAULT_MAX_CHARS
+    profile = load_profiles().get(backend)
+    return profile.choose(mode) if profile is not None else DEFAULT_MAX_CHARS
+
+
+def _measure(engine, text: str, voice: Optional[str]) -> tuple[float, Optional[float], float]:
+    """(total seconds, seconds to first audio or None, audio seconds) for one call."""
+    streaming = engine.backend in {"orpheus", "mock"} or (engine.backend == "parler" and settings.parler_stream)
+    t0 = time.perf_counter()
+    if streaming:
+        first = None
+        nbytes = 0
+        for pcm in engine.synth_stream(text, voice=voice):
+            if first is None:
+                first = time.perf_counter() - t0
+            nbytes += len(pcm)
+        return time.perf_counter() - t0, first, nbytes / 2 / engine.stream_sample_rate()
+    with tempfile.TemporaryDirectory(prefix="tts_calib_") as tmp:
+        wav = engine.synthesize_to_wav(text, Path(tmp) / "calib.wav", voice=voice)
+        elapsed = time.perf_counter() - t0
+        return elapsed, None, read_wav_layout(wav).seconds
+
+
+def calibrate(
+    engine,
+    lengths: tuple[int, ...] = CALIBRATION_LENGTHS,
+    runs: int = 2,
+    voice: Optional[str] = None,
+    log=print,
+) -> ChunkProfile:
+    """Time `engine` on the corpus at each chunk length and fit its profile."""
+    if engine.backend == "parler":
+        lengths = tuple(sorted({min(n, settings.parler_max_chars) for n in lengths}))
+    _measure(engine, corpus_text(lengths[0]), voice)  # warm-up: model load, caches
+    samples: list[tuple[int, float]] = []
+    firsts: list[float] = []
+    chars_total, audio_total = 0, 0.0
+    for n in lengths:
+        text = corpus_text(n)
+        for _ in range(runs):
+            elapsed, first, audio_s = _measure(engine, text, voice)
+            samples.append((len(text), elapsed))
+            if first is not None:
+                firsts.append(first)
+            chars_total += len(text)
+            audio_total += audio_s
+            log(f"  {engine.backend:8} {len(text):5d} chars  {elapsed:7.3f} s  audio {audio_s:6.2f} s")
+    overhead, per_char = fit(samples)
+    firsts.sort()
+    return ChunkProfile(
+        backend=engine.backend,
+        overhead_s=round(overhead, 6),
+        per_char_s=round(per_char, 8),
+        audio_per_char_s=round(audio_total / chars_total, 6) if chars_total else 0.0,
+        first_audio_s=round(firsts[len(firsts) // 2], 4) if firsts else None,
+        min_chars=min(len(corpus_text(n)) for n in lengths),
+        max_chars=max(len(corpus_text(n)) for n in lengths),
+        samples=len(samples),
+        host=f"{platform.node()} ({os.cpu_count()} cpus)",
+        measured_at=time.time(),
+    )
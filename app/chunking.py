@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import regex as re
-from typing import Iterable
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
 
 # Split by paragraphs first, then by sentences if needed
 
@@ -46,3 +47,130 @@ def chunk_text(paragraphs: list[str], max_chars: int = 1500) -> list[str]:
 def iter_chunks(text: str, max_chars: int = 1500) -> Iterable[str]:
     return chunk_text(split_paragraphs(text), max_chars=max_chars)
 
+
+
+# Pause planning: paragraph/heading/page boundaries become generated silence
+# instead of punctuation the model has to "read", and short paragraphs are
+# merged so each synthesis call carries enough text to amortize its overhead.
+
+PAGE_BREAK = "\f"
+HEADING_MAX_CHARS = 80
+_TERMINAL = (".", "!", "?", "…", ":", ";", "»", '"', ")")
+
+
+@dataclass
+class PlannedChunk:
+    text: str
+    pause_s: float = 0.0  # silence to append after this chunk
+
+
+def is_heading(para: str) -> bool:
+    """Short single line without terminal punctuation (titles, section headers, list items)."""
+    return len(para) <= HEADING_MAX_CHARS and "\n" not in para and not para.rstrip().endswith(_TERMINAL)
+
+
+def _short_line(block: Optional[str]) -> bool:
+    return block is not None and block != PAGE_BREAK and is_heading(block)
+
+
+def is_standalone_heading(prev: Optional[str], block: str, nxt: Optional[str]) -> bool:
+    """A short line is a heading only when isolated; runs of short lines are list items."""
+    return is_heading(block) and not _short_line(prev) and not _short_line(nxt)
+
+
+def _terminate(text: str) -> str:
+    return text if text.endswith((".", "!", "?", ":")) else text + "."
+
+
+def iter_blocks(sections: Iterable[str]) -> Iterator[str]:
+    """Paragraph blocks of normalized text sections, with PAGE_BREAK between sections."""
+    for i, section in enumerate(sections):
+        if i:
+            yield PAGE_BREAK
+        for block in PARA_SPLIT.split(section):
+            block = block.strip(" \t\n")
+            if block:
+                yield block
+
+
+def plan_chunks(
+    text: str,
+    max_chars: int = 1500,
+    min_chars: int = 200,
+    paragraph_pause_s: float = 0.4,
+    heading_pause_s: float = 0.7,
+    page_pause_s: float = 1.0,
+) -> list[PlannedChunk]:
+    """Group paragraphs into synthesis chunks with the pause to insert after each.
+
+    Consecutive short paragraphs are merged (up to `max_chars`) until a chunk
+    holds at least `min_chars`; so are runs of two or more short unpunctuated
+    lines (list items). An isolated short line is a heading and stands alone.
+    Paragraphs longer than `max_chars` are split by sentences with no pause
+    between the pieces.
+    """
+    return list(
+        iter_plan_chunks(iter_blocks([text]), max_chars, min_chars, paragraph_pause_s, heading_pause_s, page_pause_s)
+    )
+
+
+def iter_plan_chunks(
+    blocks: Iterable[str],
+    max_chars: int = 1500,
+    min_chars: int = 200,
+    paragraph_pause_s: float = 0.4,
+    heading_pause_s: float = 0.7,
+    page_pause_s: float = 1.0,
+) -> Iterator[PlannedChunk]:
+    """Incremental `plan_chunks` over paragraph blocks (see `iter_blocks`).
+
+    Reads two blocks ahead (telling a heading from a list item needs the
+    neighbours of the next block) and holds back the latest chunk until the
+    next one is decided, since a following page break can still raise its pause.
+    """
+    plan: list[PlannedChunk] = []
+    group: list[str] = []
+
+    def flush(pause: float) -> None:
+        if group:
+            plan.append(PlannedChunk(" ".join(_terminate(g) for g in group), pause))
+            group.clear()
+        elif plan:
+            plan[-1].pause_s = max(plan[-1].pause_s, pause)
+
+    it = iter(blocks)
+    prev: Optional[str] = None
+    block, nxt, after = next(it, None), next(it, None), next(it, None)
+    while block is not None:
+        if block == PAGE_BREAK:
+            flush(page_pause_s)
+        else:
+            next_heading = nxt is not None and is_standalone_heading(block, nxt, after)
+            boundary = paragraph_pause_s
+            if nxt == PAGE_BREAK:
+                boundary = page_pause_s
+            elif next_heading:
+                boundary = heading_pause_s
+
+            if is_standalone_heading(prev, block, nxt):
+                flush(heading_pause_s)
+                group.append(block)
+                flush(boundary)
+            elif len(block) > max_chars:
+                flush(paragraph_pause_s)
+                pieces = chunk_text([block], max_chars=max_chars)
+                plan.extend(PlannedChunk(_terminate(p)) for p in pieces)
+                plan[-1].pause_s = boundary
+            else:
+                if group and sum(len(g) + 2 for g in group) + len(block) > max_chars:
+                    flush(paragraph_pause_s)
+                group.append(block)
+                if sum(len(g) + 2 for g in group) >= min_chars or nxt is None or nxt == PAGE_BREAK or next_heading:
+                    flush(boundary)
+        while len(plan) > 1:
+            yield plan.pop(0)
+        prev, block, nxt, after = block, nxt, after, next(it, None)
+    flush(0.0)
+    if plan:
+        plan[-1].pause_s = 0.0
+    yield from plan
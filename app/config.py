@@ -30,6 +30,130 @@ class Settings:
     # Parler TTS (prosody/style via text prompt)
     # - PARLER_MODEL: HF model id (e.g., "parler-tts/parler-tts-mini-v1")
     parler_model: str = os.getenv("PARLER_MODEL", "parler-tts/parler-tts-mini-v1")
+    # - PARLER_MAX_CHARS: chunk size cap (Parler is slow on long inputs, esp. on CPU)
+    # - PARLER_CPU_INT8=1: dynamic int8 quantization of Linear layers (CPU nodes)
+    # - PARLER_THREADS: intra-op thread count for torch (0 = CPU budget share)
+    # - PARLER_CACHE_DIR: where quantized models are cached between runs
+    parler_max_chars: int = int(os.getenv("PARLER_MAX_CHARS", 300))
+    parler_cpu_int8: bool = os.getenv("PARLER_CPU_INT8", "0").lower() in {"1", "true", "yes", "on"}
+    parler_threads: int = int(os.getenv("PARLER_THREADS", 0))
+    parler_cache_dir: str = os.getenv(
+        "PARLER_CACHE_DIR", (Path.home() / ".cache" / "ttsdocreader" / "parler").as_posix()
+    )
+    # - PARLER_STREAM=1: decode while generating, so audio starts before a chunk finishes
+    # - PARLER_STREAM_STEP_S: seconds of audio generated between partial decodes
+    parler_stream: bool = os.getenv("PARLER_STREAM", "1").lower() in {"1", "true", "yes", "on"}
+    parler_stream_step_s: float = float(os.getenv("PARLER_STREAM_STEP_S", 0.5))
+
+    # Chunk planning (see app/chunking.py:plan_chunks)
+    # - MIN_CHUNK_CHARS: short paragraphs are merged until a chunk reaches this size
+    # - PAUSE_*_MS: silence inserted after a paragraph / before a heading / at a page break
+    min_chunk_chars: int = int(os.getenv("MIN_CHUNK_CHARS", 200))
+    pause_paragraph_ms: int = int(os.getenv("PAUSE_PARAGRAPH_MS", 400))
+    pause_heading_ms: int = int(os.getenv("PAUSE_HEADING_MS", 700))
+    pause_page_ms: int = int(os.getenv("PAUSE_PAGE_MS", 1000))
+
+    # Pipelined execution (see app/pipeline.py): bounded queues between the
+    # text stage and the synthesis stage (chunks) and between synthesis and the
+    # audio sink (audio pieces). Smaller = less memory, larger = more slack.
+    pipeline_text_queue: int = int(os.getenv("PIPELINE_TEXT_QUEUE", 8))
+    pipeline_audio_queue: int = int(os.getenv("PIPELINE_AUDIO_QUEUE", 256))
+
+    # Chunk sizing when max_chars is not given (see app/calibration.py)
+    # - CHUNK_MODE: throughput (lowest total time) | latency (fastest first audio) | fixed (1500)
+    # - CALIBRATION_FILE: per-backend profiles written by scripts/calibrate_chunks.py
+    chunk_mode: str = os.getenv("CHUNK_MODE", "throughput").lower()
+    calibration_file: str = os.getenv(
+        "CALIBRATION_FILE", os.path.join(os.getenv("OUTPUT_DIR", "outputs"), "chunk_profiles.json")
+    )
+
+    # Web scheduling (chunk-level fair queuing, see app/scheduler.py)
+    # - WORKERS: number of synthesis calls allowed to run concurrently
+    # - CLIENT_MAX_CONCURRENCY: worker slots a single client may hold at once
+    # - INTERACTIVE_MAX_CHARS: documents up to this size get the interactive class
+    workers: int = int(os.getenv("WORKERS", 1))
+    client_max_concurrency: int = int(os.getenv("CLIENT_MAX_CONCURRENCY", 1))
+    interactive_max_chars: int = int(os.getenv("INTERACTIVE_MAX_CHARS", 4000))
+    # - TRUSTED_PROXIES: comma-separated reverse-proxy addresses whose X-Forwarded-For is honoured
+    trusted_proxies: frozenset = frozenset(
+        h.strip() for h in os.getenv("TRUSTED_PROXIES", "").split(",") if h.strip()
+    )
+
+    # CPU thread budget (see app/resources.py)
+    # - CPU_BUDGET: cores shared by all workers (0 = every core this process may use)
+    # - CPU_PIN=1: pin each worker slot to its own core range
+    cpu_budget: int = int(os.getenv("CPU_BUDGET", 0))
+    cpu_pin: bool = os.getenv("CPU_PIN", "0").lower() in {"1", "true", "yes", "on"}
+
+    # Voice previews (/api/preview)
+    # - PREVIEW_SLOTS: extra worker slots reserved for previews
+    # - PREVIEW_CACHE_DIR: persistent cache of rendered previews
+    # - PREVIEW_CACHE_MAX_FILES: least recently used previews beyond this are deleted
+    # - PREVIEW_TEXT: sentence used when the client doesn't send one
+    preview_slots: int = int(os.getenv("PREVIEW_SLOTS", 1))
+    preview_cache_dir: str = os.getenv(
+        "PREVIEW_CACHE_DIR", os.path.join(os.getenv("OUTPUT_DIR", "outputs"), ".preview_cache")
+    )
+    preview_cache_max_files: int = int(os.getenv("PREVIEW_CACHE_MAX_FILES", 500))
+    preview_text: str = os.getenv(
+        "PREVIEW_TEXT", "Bonjour, ceci est un aperçu de la voix sélectionnée."
+    )
+    preview_max_chars: int = int(os.getenv("PREVIEW_MAX_CHARS", 300))
+
+    # Content-addressed output store for /synthesize (see app/store.py)
+    # - STORE_DIR, STORE_TTL_S (entry lifetime), STORE_MAX_BYTES (LRU eviction above this)
+    store_dir: str = os.getenv("STORE_DIR", os.path.join(os.getenv("OUTPUT_DIR", "outputs"), "store"))
+    store_ttl_s: int = int(os.getenv("STORE_TTL_S", 7 * 24 * 3600))
+    store_max_bytes: int = int(os.getenv("STORE_MAX_BYTES", 5 * 1024**3))
+
+    # Uploads (see app/uploads.py)
+    # - MAX_UPLOAD_MB: larger documents are refused with 413 (0 = no limit)
+    # - UPLOAD_TMP_DIR: where per-request upload directories go (system temp if unset)
+    max_upload_mb: int = int(os.getenv("MAX_UPLOAD_MB", 100))
+    upload_tmp_dir: str | None = os.getenv("UPLOAD_TMP_DIR") or None
+
+    # Batch endpoint (/api/batch, see app/batch.py)
+    # - BATCH_MAX_FILES: documents per request (each still capped by MAX_UPLOAD_MB)
+    # - BATCH_CONCURRENCY: documents of one batch in flight at once (WORKERS still bounds synthesis)
+    batch_max_files: int = int(os.getenv("BATCH_MAX_FILES", 50))
+    batch_concurrency: int = int(os.getenv("BATCH_CONCURRENCY", 4))
+
+    # Background jobs and segmented (HLS-style) output
+    # - JOBS_DIR: per-job working directories (uploads, results, segments)
+    # - JOB_TTL_S: finished jobs older than this are forgotten and deleted
+    # - SEGMENT_SECONDS / SEGMENT_BITRATE (MP3 segments, encoded by ffmpeg)
+    jobs_dir: str = os.getenv("JOBS_DIR", os.path.join(os.getenv("OUTPUT_DIR", "outputs"), "jobs"))
+    job_ttl_s: int = int(os.getenv("JOB_TTL_S", 24 * 3600))
+    segment_seconds: float = float(os.getenv("SEGMENT_SECONDS", 6))
+    segment_bitrate: str = os.getenv("SEGMENT_BITRATE", "128k")
+
+    # Read-along sessions (/api/readalong, see app/readalong.py)
+    # - READALONG_LOOKAHEAD: chunks pre-synthesized after the listener's position
+    # - READALONG_MAX_CHARS: default chunk size (smaller = faster first audio)
+    # - READALONG_TTL_S: idle sessions are closed and deleted after this
+    readalong_dir: str = os.getenv(
+        "READALONG_DIR", os.path.join(os.getenv("OUTPUT_DIR", "outputs"), "readalong")
+    )
+    readalong_lookahead: int = int(os.getenv("READALONG_LOOKAHEAD", 2))
+    readalong_max_chars: int = int(os.getenv("READALONG_MAX_CHARS", 400))
+    readalong_ttl_s: int = int(os.getenv("READALONG_TTL_S", 2 * 3600))
+
+    # Web startup warm-up (see app/warmup.py)
+    # - WARMUP_BACKENDS: comma-separated backends to preload; unset = TTS_BACKEND, "none" disables
+    # - WARMUP_TEXT: short sentence synthesized once per backend
+    warmup_backends: str | None = os.getenv("WARMUP_BACKENDS") or None
+    warmup_text: str = os.getenv("WARMUP_TEXT", "Bonjour.")
+
+    # Mock backend timing (see app/mock_backend.py), for load tests without models
+    # - MOCK_PROFILE: instant | orpheus | piper | parler
+    # - MOCK_RTF, MOCK_FIRST_CHUNK_MS, MOCK_JITTER, MOCK_MEMORY_MB: override the preset
+    mock_profile: str = os.getenv("MOCK_PROFILE", "instant").lower()
+    mock_rtf: float | None = float(os.environ["MOCK_RTF"]) if os.getenv("MOCK_RTF") else None
+    mock_first_chunk_ms: float | None = (
+        float(os.environ["MOCK_FIRST_CHUNK_MS"]) if os.getenv("MOCK_FIRST_CHUNK_MS") else None
+    )
+    mock_jitter: float | None = float(os.environ["MOCK_JITTER"]) if os.getenv("MOCK_JITTER") else None
+    mock_memory_mb: int | None = int(os.environ["MOCK_MEMORY_MB"]) if os.getenv("MOCK_MEMORY_MB") else None
 
 
 settings = Settings()
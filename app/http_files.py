@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+# File responses with single-range (206) support and caching headers, used for
+# playlist segments and stored outputs. Independent of the Starlette version.
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+_BLOCK = 256 * 1024
+
+
+def _iter_range(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining:
+            data = f.read(min(_BLOCK, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def file_response(
+    request: Request,
+    path: str | Path,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    cache_control: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """Serve `path` honouring If-None-Match and a single `Range: bytes=a-b`."""
+    p = Path(path)
+    st = p.stat()
+    tag = etag or f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": tag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+    }
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if tag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).timestamp()
+        except (TypeError, ValueError):
+            since = None
+        if since is not None and int(st.st_mtime) <= since:
+            return Response(status_code=304, headers=headers)
+
+    rng = request.headers.get("range")
+    if rng:
+        m = _RANGE.match(rng.strip())
+        size = st.st_size
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+            else:  # suffix range: last N bytes
+                start = max(0, size - int(m.group(2)))
+                end = size - 1
+            if start >= size or start > end:
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(
+                _iter_range(p, start, end - start + 1),
+                status_code=206,
+                media_type=media_type,
+                headers=headers,
+            )
+
+    return FileResponse(
+        os.fspath(p),
+        media_type=media_type,
+        filename=filename,
+        headers=headers,
+    )
+
+
+class _ReleasingResponse(Response):
+    """Sends `inner`, then calls `release` whether or not the client stayed."""
+
+    def __init__(self, inner: Response, release: Callable[[], None]):
+        self.inner = inner
+        self.release = release
+        self.status_code = inner.status_code
+        self.background = None
+        self.raw_headers = inner.raw_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.inner(scope, receive, send)
+        finally:
+            self.release()
+
+
+def release_after(response: Response, release: Callable[[], None]) -> Response:
+    """Wrap `response` so `release` runs once it has been sent (or the send failed)."""
+    return _ReleasingResponse(response, release)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from .config import settings
+from .tracing import Tracer, tracing
+
+# Background synthesis jobs for the web app. Each job owns a working directory
+# under JOBS_DIR; the actual synthesis calls are still metered by the scheduler.
+
+
+@dataclass
+class BackgroundJob:
+    id: str
+    workdir: Path
+    status: str = "queued"  # queued | running | done | error
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[Path] = None
+    error: Optional[str] = None
+    segmented: bool = False
+    traced: bool = False  # record a Chrome trace of the run (trace.json in workdir)
+    progress: Optional[dict] = None  # latest ProgressTracker snapshot
+    version: int = 0  # bumped on every status/progress change (polled by SSE)
+
+    def publish(self, event: dict) -> None:
+        """Progress callback for the pipeline."""
+        self.progress = event
+        self.version += 1
+
+    @property
+    def segments_dir(self) -> Path:
+        return self.workdir / "hls"
+
+    @property
+    def trace_path(self) -> Path:
+        return self.workdir / "trace.json"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+            "segmented": self.segmented,
+            "progress": self.progress,
+            "result": f"/api/jobs/{self.id}/result" if self.status == "done" else None,
+            "filename": self.result.name if self.result is not None else None,
+            "playlist": f"/api/jobs/{self.id}/hls/index.m3u8" if self.segmented else None,
+            "trace": f"/api/jobs/{self.id}/trace" if self.traced and self.finished is not None else None,
+        }
+
+
+class JobRegistry:
+    def __init__(self, root: str | Path, ttl_s: int):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self._jobs: dict[str, BackgroundJob] = {}
+        self._lock = threading.Lock()
+
+    def create(self, segmented: bool = False, traced: bool = False) -> BackgroundJob:
+        self.prune()
+        job_id = uuid.uuid4().hex
+        workdir = self.root / job_id
+        workdir.mkdir(parents=True, exist_ok=True)
+        job = BackgroundJob(id=job_id, workdir=workdir, segmented=segmented, traced=traced)
+        with self._lock:
+            self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def start(self, job: BackgroundJob, fn: Callable[[], Path]) -> None:
+        """Run `fn` on a daemon thread; its return value becomes the job result."""
+
+        def run() -> None:
+            job.status = "running"
+            job.started = time.time()
+            job.version += 1
+            tracer = Tracer(f"job {job.id[:8]}") if job.traced else None
+            try:
+                with tracing(tracer):
+                    result = fn()
+            except Exception as e:
+                traceback.print_exc()
+                result = None
+                job.error = str(e) or e.__class__.__name__
+            if tracer is not None:
+                # Written before the final status so clients see it with "done"/"error"
+                try:
+                    tracer.write(job.trace_path)
+                except OSError as e:
+                    print(f"[WARN] Could not write trace for job {job.id}: {e}")
+            job.result = result
+            job.finished = time.time()
+            job.status = "done" if job.error is None else "error"
+            job.version += 1
+
+        threading.Thread(target=run, name=f"job-{job.id[:8]}", daemon=True).start()
+
+    def discard(self, job: BackgroundJob) -> None:
+        """Drop a job that was never started (e.g. its upload was refused)."""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        shutil.rmtree(job.workdir, ignore_errors=True)
+
+    def prune(self) -> None:
+        """Forget and delete finished jobs older than the TTL."""
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            stale = [j for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]
+            for j in stale:
+                del self._jobs[j.id]
+        for j in stale:
+            shutil.rmtree(j.workdir, ignore_errors=True)
+
+
+jobs = JobRegistry(settings.jobs_dir, settings.job_ttl_s)
@@ -1,16 +1,53 @@
 from __future__ import annotations
 
-import tempfile
+import asyncio
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, Request, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse
 
+from . import resources
+from .batch import Batch, BatchItem
+from .calibration import CHUNK_MODES
 from .config import settings
+from .http_files import file_response, release_after
+from .jobs import jobs
 from .pipeline import synthesize_document
 from .piper_voices import list_piper_voices_json
+from .preview import get_preview, release_preview
+from .readalong import SessionOptions, sessions
+from .scheduler import scheduler
+from .segments import PLAYLIST_NAME, SegmentWriter, segments_available
+from .store import StoredOutput, store, synthesize_to_store
+from .text_extract import extract_text
+from .uploads import UploadLimitMiddleware, UploadTooLarge, discard, save_upload, upload_dir
+from .warmup import Warmup, configured_backends
 
-app = FastAPI(title="TTSDocReader")
+warmup = Warmup(configured_backends())
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    print(f"[INFO] {resources.describe()}")
+    warmup.start()
+    yield
+
+
+app = FastAPI(title="TTSDocReader", lifespan=lifespan)
+
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large(_request: Request, exc: UploadTooLarge):
+    return JSONResponse({"detail": str(exc)}, status_code=413)
+
+
+# Oversized uploads get 413 from Content-Length, or as soon as a chunked body passes the limit
+app.add_middleware(UploadLimitMiddleware, files_per_path={"/api/batch": settings.batch_max_files})
 
 INDEX_HTML = f"""
 <!doctype html>
@@ -160,6 +197,10 @@ INDEX_HTML = f"""
             <input id='ovoice' type='text' placeholder='e.g., lea' />
           </div>
         </div>
+        <div class='toolbar'>
+          <span id='previewStatus' class='hint'></span>
+          <button id='previewBtn' class='btn btn-ghost' type='button' title='Listen to a short sample with these settings'>Preview voice</button>
+        </div>
       </div>
       
       <div class='card'>
@@ -185,7 +226,7 @@ INDEX_HTML = f"""
           </div>
           <div>
             <label>Max block length (chars)</label>
-            <input name='max_chars' id='max_chars' type='number' min='500' max='3000' value='1500' />
+            <input name='max_chars' id='max_chars' type='number' min='100' max='3000' placeholder='auto' />
           </div>
         </div>
         
@@ -276,21 +317,51 @@ INDEX_HTML = f"""
     loadPiperVoices();
     ovoiceEl?.addEventListener('input', () => {{ if (backendEl.value === 'orpheus') {{ voiceInput.value = (ovoiceEl.value || '').trim(); }} }});
     parlerPrompt?.addEventListener('input', () => {{ if (backendEl.value === 'parler') {{ voiceInput.value = (parlerPrompt.value || '').trim(); }} }});
+    const previewBtn = $('#previewBtn');
+    const previewStatus = $('#previewStatus');
+    previewBtn.addEventListener('click', async () => {{
+      const qs = new URLSearchParams({{ backend: backendEl.value, temperature: $('#temperature').value, repetition_penalty: $('#repetition_penalty').value }});
+      if (voiceInput.value) {{ qs.set('voice', voiceInput.value); }}
+      previewBtn.disabled = true; previewStatus.textContent = 'Loading preview...';
+      try {{
+        const res = await fetch('/api/preview?' + qs.toString());
+        if (!res.ok) {{ previewStatus.textContent = 'Preview error: ' + res.status; return; }}
+        const url = URL.createObjectURL(await res.blob());
+        previewStatus.textContent = res.headers.get('X-Preview-Cache') === 'hit' ? 'Preview (cached)' : 'Preview';
+        new Audio(url).play();
+      }} catch (e) {{ previewStatus.textContent = 'Network error.'; }}
+      finally {{ previewBtn.disabled = false; }}
+    }});
     function setBusy(isBusy, text) {{ btn.disabled = isBusy; if (isBusy) {{ btn.innerHTML = 'Synthesizing <span class=\"spinner\"></span>'; }} else {{ btn.textContent = 'Synthesize'; }} progress.classList.toggle('show', isBusy); if (!isBusy) {{ bar.style.width = '0%'; }} statusEl.textContent = text || ''; }}
-    function parseFileName(xhr) {{ try {{ const dispo = xhr.getResponseHeader('Content-Disposition') || ''; const m = /filename\*=UTF-8''([^;]+)|filename=\"?([^\";]+)\"?/i.exec(dispo); const name = decodeURIComponent(m?.[1] || m?.[2] || '').trim(); if (name) return name; }} catch {{}} return 'output'; }}
+    function fmtSecs(s) {{ if (s === null || s === undefined) return '?'; s = Math.round(s); return s >= 60 ? `${{Math.floor(s/60)}} min ${{s%60}} s` : `${{s}} s`; }}
+    function followJob(job) {{
+      const es = new EventSource(`/api/jobs/${{job.id}}/events`);
+      const onState = (ev) => {{
+        const st = JSON.parse(ev.data); const p = st.progress;
+        if (p && p.chunks_total) {{
+          bar.style.width = ((p.chunks_done / p.chunks_total) * 100).toFixed(1) + '%';
+          const rtf = p.rtf ? ` · RTF ${{p.rtf.toFixed(2)}}` : '';
+          statusEl.textContent = `Synthesizing: ${{p.chunks_done}}/${{p.chunks_total}} blocks · ${{fmtSecs(p.audio_seconds)}} audio${{rtf}} · ETA ${{fmtSecs(p.eta_s)}}`;
+        }}
+        return st;
+      }};
+      es.addEventListener('progress', onState);
+      es.addEventListener('done', (ev) => {{ es.close(); const st = onState(ev); setBusy(false, 'Done.'); player.src = st.result; player.classList.remove('hidden'); download.href = st.result; download.download = st.filename || 'output'; download.classList.remove('hidden'); }});
+      es.addEventListener('error', (ev) => {{ if (!ev.data) return; es.close(); const st = JSON.parse(ev.data); setBusy(false, 'Error: ' + (st.error || 'synthesis failed')); }});
+    }}
     form.addEventListener('submit', (ev) => {{
       ev.preventDefault();
       const fd = new FormData(form);
       if (!fd.get('file')) {{ alert('Please choose a file.'); return; }}
+      if (!fd.get('max_chars')) fd.delete('max_chars');  // empty = calibrated size
       const xhr = new XMLHttpRequest();
-      xhr.open('POST', form.action);
-      xhr.responseType = 'blob';
+      xhr.open('POST', '/api/jobs');
+      xhr.responseType = 'json';
       setBusy(true, 'Uploading...');
       xhr.upload.onprogress = (e) => {{ if (e.lengthComputable) {{ bar.style.width = ((e.loaded/e.total)*100).toFixed(1)+'%'; }} }};
       xhr.onloadstart = () => {{ bar.style.width = '5%'; }};
-      xhr.onreadystatechange = () => {{ if (xhr.readyState === 2) {{ setBusy(true, 'Synthesizing...'); }} }};
       xhr.onerror = () => {{ setBusy(false, 'Network error.'); }};
-      xhr.onload = () => {{ if (xhr.status >= 200 && xhr.status < 300) {{ setBusy(false, 'Done.'); const blob = xhr.response; const url = URL.createObjectURL(blob); player.src = url; player.classList.remove('hidden'); const filename = parseFileName(xhr); download.href = url; download.download = filename; download.classList.remove('hidden'); }} else {{ setBusy(false, 'Error: ' + xhr.status); }} }};
+      xhr.onload = () => {{ if (xhr.status >= 200 && xhr.status < 300) {{ bar.style.width = '0%'; statusEl.textContent = 'Synthesizing...'; followJob(xhr.response); }} else {{ setBusy(false, 'Error: ' + xhr.status); }} }};
       xhr.send(fd);
     }});
   </script>
@@ -304,36 +375,424 @@ async def index():
     return INDEX_HTML
 
 
+def _client_id(request: Request) -> str:
+    """Fair-share key: the client address, or an X-Client-Id set by a trusted proxy.
+
+    Only peers listed in TRUSTED_PROXIES may name the client, through
+    X-Client-Id or X-Forwarded-For (the last hop not added by a trusted
+    proxy); from anyone else both headers are ignored, so a client cannot
+    pick a fresh key per request to escape CLIENT_MAX_CONCURRENCY.
+    """
+    peer = request.client.host if request.client else "anonymous"
+    trusted = settings.trusted_proxies
+    if peer in trusted:
+        explicit = request.headers.get("x-client-id", "").strip()
+        if explicit:
+            return explicit
+        hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+        for hop in reversed(hops):
+            if hop not in trusted:
+                return hop
+    return peer
+
+
 @app.post("/synthesize")
 async def synthesize(
+    request: Request,
     file: UploadFile = File(...),
     voice: str | None = Form(None),
     backend: str | None = Form(None),
     temperature: float = Form(settings.temperature),
     repetition_penalty: float = Form(settings.repetition_penalty),
     audio_format: str = Form(settings.audio_format),
-    max_chars: int = Form(1500),
+    max_chars: int | None = Form(None),
+    chunk_mode: str | None = Form(None),
+):
+    _check_chunk_mode(chunk_mode)
+    # Unique per-request directory: same-named uploads never collide
+    tmp_dir = upload_dir()
+    try:
+        upload = await save_upload(file, tmp_dir)
+        # Run off the event loop; the scheduler decides which chunk runs next
+        job = scheduler.open_job(_client_id(request))
+        stored, hit = await run_in_threadpool(
+            synthesize_to_store,
+            upload.path,
+            upload.sha256,
+            voice=voice or None,
+            temperature=temperature,
+            repetition_penalty=repetition_penalty,
+            max_chars=max_chars,
+            backend=(backend or settings.tts_backend),
+            audio_format=audio_format,
+            job=job,
+            chunk_mode=chunk_mode,
+        )
+    finally:
+        discard(tmp_dir)
+    return _stored_response(request, stored, hit)
+
+
+@app.post("/api/batch")
+async def api_batch(
+    request: Request,
+    files: list[UploadFile] = File(...),
+    voice: str | None = Form(None),
+    backend: str | None = Form(None),
+    temperature: float = Form(settings.temperature),
+    repetition_penalty: float = Form(settings.repetition_penalty),
+    audio_format: str = Form(settings.audio_format),
+    max_chars: int | None = Form(None),
+    chunk_mode: str | None = Form(None),
 ):
-    # Cross-platform temporary storage
-    tmp_dir = Path(tempfile.gettempdir()) / "orpheus_uploads"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    safe_name = Path(file.filename).name or "upload"
-    tmp_path = tmp_dir / safe_name
-    content = await file.read()
-    tmp_path.write_bytes(content)
-
-    out_path = synthesize_document(
-        tmp_path,
+    """Synthesize many documents with shared parameters; streams a ZIP as they finish.
+
+    The archive holds one audio file per successful document (`NNN_<name>.wav|mp3`)
+    and a final manifest.json with per-document timings, cache status and errors.
+    """
+    if len(files) > settings.batch_max_files:
+        raise HTTPException(status_code=413, detail=f"At most {settings.batch_max_files} documents per batch")
+    _check_chunk_mode(chunk_mode)
+    tmp_dir = upload_dir(prefix="tts_batch_")
+    items: list[BatchItem] = []
+    try:
+        for i, f in enumerate(files):
+            # One directory per document: renders land next to their upload
+            doc_dir = tmp_dir / f"{i:03d}"
+            doc_dir.mkdir()
+            saved = await save_upload(f, doc_dir)
+            items.append(BatchItem(i, saved.path.name, saved.path, saved.sha256, saved.size))
+    except BaseException:
+        discard(tmp_dir)
+        raise
+
+    client = _client_id(request)
+    options = dict(
         voice=voice or None,
         temperature=temperature,
         repetition_penalty=repetition_penalty,
         max_chars=max_chars,
         backend=(backend or settings.tts_backend),
         audio_format=audio_format,
+        chunk_mode=chunk_mode,
+    )
+    batch = Batch(uuid.uuid4().hex, items, options)
+
+    def run_one(item: BatchItem):
+        # Each document is its own scheduler job: the batch shares workers
+        # fairly with other clients instead of holding them all
+        return synthesize_to_store(item.path, item.sha256, job=scheduler.open_job(client), **options)
+
+    def stream():
+        # Uploads are removed once no document still reads them, not when the client goes
+        yield from batch.iter_zip(run_one, settings.batch_concurrency, cleanup=lambda: discard(tmp_dir))
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="batch-{batch.id[:8]}.zip"'},
+    )
+
+
+def _check_chunk_mode(chunk_mode: str | None) -> None:
+    if chunk_mode is not None and chunk_mode not in CHUNK_MODES:
+        raise HTTPException(status_code=400, detail=f"chunk_mode must be one of {', '.join(CHUNK_MODES)}")
+
+
+def _stored_response(request: Request, stored: StoredOutput, hit: bool | None = None):
+    """Serve a pinned store entry; the pin is released once the response is sent."""
+    try:
+        resp = file_response(
+            request,
+            stored.path,
+            filename=stored.filename,
+            etag=stored.etag,
+            cache_control="private, max-age=0, must-revalidate",
+        )
+    except BaseException:
+        store.release(stored.key)
+        raise
+    resp.headers["Content-Location"] = f"/api/outputs/{stored.key}"
+    if hit is not None:
+        resp.headers["X-Cache"] = "hit" if hit else "miss"
+    return release_after(resp, lambda: store.release(stored.key))
+
+
+@app.get("/api/outputs/{key}")
+async def api_output(key: str, request: Request):
+    """Re-fetch a stored result; honours If-None-Match / If-Modified-Since (304)."""
+    stored = store.acquire(key) if key.isalnum() else None
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired output")
+    return _stored_response(request, stored)
+
+
+@app.post("/api/jobs")
+async def api_create_job(
+    request: Request,
+    file: UploadFile = File(...),
+    voice: str | None = Form(None),
+    backend: str | None = Form(None),
+    temperature: float = Form(settings.temperature),
+    repetition_penalty: float = Form(settings.repetition_penalty),
+    audio_format: str = Form(settings.audio_format),
+    max_chars: int | None = Form(None),
+    chunk_mode: str | None = Form(None),
+    output_mode: str = Form("file"),
+    trace: bool = Form(False),
+):
+    """Start synthesis in the background; poll the job or play its HLS playlist.
+
+    With `trace=true` the run is recorded as a Chrome trace (GET .../trace).
+    """
+    if output_mode not in {"file", "segmented"}:
+        raise HTTPException(status_code=400, detail="output_mode must be 'file' or 'segmented'")
+    if output_mode == "segmented" and not segments_available():
+        raise HTTPException(status_code=503, detail="Segmented output requires ffmpeg")
+    _check_chunk_mode(chunk_mode)
+    job = jobs.create(segmented=(output_mode == "segmented"), traced=trace)
+    try:
+        upload = (await save_upload(file, job.workdir)).path
+        segments = SegmentWriter(job.segments_dir) if job.segmented else None
+    except BaseException:
+        jobs.discard(job)  # too large, disk full or request cancelled: never leave it "queued"
+        raise
+    sched_job = scheduler.open_job(_client_id(request))
+
+    def run() -> Path:
+        try:
+            return synthesize_document(
+                upload,
+                out_wav=job.workdir / f"{upload.stem}.wav",
+                voice=voice or None,
+                temperature=temperature,
+                repetition_penalty=repetition_penalty,
+                max_chars=max_chars,
+                backend=(backend or settings.tts_backend),
+                audio_format=audio_format,
+                job=sched_job,
+                segments=segments,
+                progress=job.publish,
+                chunk_mode=chunk_mode,
+            )
+        finally:
+            upload.unlink(missing_ok=True)  # only the result stays in the job directory
+            if segments is not None:
+                segments.abort()  # no-op after a clean close; ends the playlist on failure
+
+    jobs.start(job, run)
+    return JSONResponse(job.to_dict(), status_code=202)
+
+
+def _get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+async def api_job_status(job_id: str):
+    return JSONResponse(_get_job(job_id).to_dict())
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def api_job_events(job_id: str):
+    """Server-Sent Events: `progress` per finished chunk, then `done` or `error`."""
+    job = _get_job(job_id)
+
+    async def stream():
+        seen = -1
+        idle = 0.0
+        while True:
+            if job.version != seen:
+                seen = job.version
+                idle = 0.0
+                state = job.to_dict()
+                if job.status in {"done", "error"}:
+                    yield f"event: {job.status}\ndata: {json.dumps(state)}\n\n"
+                    return
+                yield f"event: progress\ndata: {json.dumps(state)}\n\n"
+            elif idle >= 15.0:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.25)
+            idle += 0.25
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def api_job_result(job_id: str, request: Request):
+    job = _get_job(job_id)
+    if job.status != "done" or job.result is None:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return file_response(request, job.result, filename=job.result.name)
+
+
+@app.get("/api/jobs/{job_id}/trace")
+async def api_job_trace(job_id: str, request: Request):
+    """Chrome trace-event JSON of a job started with `trace=true` (open in Perfetto)."""
+    job = _get_job(job_id)
+    if not job.traced:
+        raise HTTPException(status_code=404, detail="Job was not traced")
+    if job.finished is None or not job.trace_path.is_file():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return file_response(request, job.trace_path, media_type="application/json", filename=f"trace-{job.id[:8]}.json")
+
+
+@app.get("/api/jobs/{job_id}/hls/{name}")
+async def api_job_segment(job_id: str, name: str, request: Request):
+    job = _get_job(job_id)
+    if not job.segmented:
+        raise HTTPException(status_code=404, detail="Job has no segmented output")
+    path = job.segments_dir / Path(name).name
+    if name.startswith(".") or not path.is_file():
+        raise HTTPException(status_code=404, detail="Segment not ready")
+    if name == PLAYLIST_NAME:
+        # Live playlist grows until #EXT-X-ENDLIST; clients must revalidate
+        return file_response(request, path, media_type="application/vnd.apple.mpegurl", cache_control="no-cache")
+    media_type = "audio/mpeg" if path.suffix == ".mp3" else "audio/wav"
+    # Segments never change once written
+    return file_response(request, path, media_type=media_type, cache_control="public, max-age=31536000, immutable")
+
+
+@app.post("/api/readalong")
+async def api_readalong_create(
+    request: Request,
+    file: UploadFile = File(...),
+    voice: str | None = Form(None),
+    backend: str | None = Form(None),
+    temperature: float = Form(settings.temperature),
+    repetition_penalty: float = Form(settings.repetition_penalty),
+    audio_format: str = Form("wav"),
+    max_chars: int = Form(settings.readalong_max_chars),
+):
+    """Open a read-along session: returns the chunk/sentence index, no audio yet."""
+    tmp_dir = upload_dir(prefix="tts_readalong_")
+    try:
+        upload = await save_upload(file, tmp_dir)
+        text = await run_in_threadpool(extract_text, upload.path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        discard(tmp_dir)
+    options = SessionOptions(
+        backend=(backend or settings.tts_backend),
+        voice=voice or None,
+        temperature=temperature,
+        repetition_penalty=repetition_penalty,
+        audio_format=audio_format,
     )
-    return FileResponse(out_path.as_posix(), filename=out_path.name)
+    # A listener is waiting on every render, so sessions run as interactive work
+    job = scheduler.open_job(_client_id(request), priority="interactive")
+    try:
+        session = await run_in_threadpool(sessions.create, text, options, job, max_chars)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(session.to_dict(include_text=True), status_code=201)
+
+
+def _get_session(session_id: str):
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return session
+
+
+def _session_chunk(session, index: int):
+    if not 0 <= index < len(session.chunks):
+        raise HTTPException(status_code=404, detail="Chunk out of range")
+    return session.chunks[index]
+
+
+@app.get("/api/readalong/{session_id}")
+async def api_readalong_status(session_id: str):
+    return JSONResponse(_get_session(session_id).to_dict())
+
+
+@app.get("/api/readalong/{session_id}/chunks/{index}")
+async def api_readalong_chunk(session_id: str, index: int, wait: float = 0.0):
+    """Move the listener to `index`; with `wait`, block up to that many seconds for its audio.
+
+    Returns the chunk with per-sentence time offsets once ready (200), else 202.
+    """
+    session = _get_session(session_id)
+    chunk = _session_chunk(session, index)
+    if wait > 0:
+        await run_in_threadpool(session.wait_ready, index, min(wait, 300.0))
+    else:
+        session.seek(index)
+    return JSONResponse(chunk.to_dict(session.id), status_code=200 if chunk.status == "ready" else 202)
+
+
+@app.get("/api/readalong/{session_id}/chunks/{index}/audio")
+async def api_readalong_audio(session_id: str, index: int, request: Request):
+    """Audio of one chunk; also moves the listener there (renders on demand)."""
+    session = _get_session(session_id)
+    chunk = _session_chunk(session, index)
+    await run_in_threadpool(session.wait_ready, index, 300.0)
+    if chunk.status == "error":
+        raise HTTPException(status_code=500, detail=chunk.error or "Synthesis failed")
+    if chunk.status != "ready" or chunk.path is None:
+        raise HTTPException(status_code=503, detail="Chunk not ready yet")
+    media_type = "audio/mpeg" if chunk.path.suffix == ".mp3" else "audio/wav"
+    return file_response(request, chunk.path, media_type=media_type, cache_control="private, max-age=3600")
+
+
+@app.delete("/api/readalong/{session_id}")
+async def api_readalong_close(session_id: str):
+    if not sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return JSONResponse({"closed": session_id})
 
 
 @app.get("/api/piper_voices")
 async def api_piper_voices():
     return JSONResponse(list_piper_voices_json())
+
+
+@app.get("/api/preview")
+async def api_preview(
+    request: Request,
+    backend: str | None = None,
+    voice: str | None = None,
+    text: str | None = None,
+    temperature: float | None = None,
+    repetition_penalty: float | None = None,
+    audio_format: str = "wav",
+):
+    try:
+        path, hit = await run_in_threadpool(
+            get_preview,
+            text,
+            backend=(backend or settings.tts_backend),
+            voice=voice or None,
+            temperature=temperature,
+            repetition_penalty=repetition_penalty,
+            audio_format=audio_format,
+            client=_client_id(request),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Preview-Cache": "hit" if hit else "miss", "Cache-Control": "public, max-age=86400"}
+    resp = FileResponse(path.as_posix(), filename=f"preview{path.suffix}", headers=headers)
+    return release_after(resp, lambda: release_preview(path))
+
+
+@app.get("/api/metrics")
+async def api_metrics():
+    return JSONResponse({"scheduler": scheduler.metrics(), "resources": resources.report()})
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving (models may still be loading)."""
+    return JSONResponse({"status": "ok", "uptime_s": time.time() - warmup.started})
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: every configured backend is loaded and warmed up."""
+    return JSONResponse(warmup.report(), status_code=200 if warmup.ready else 503)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Iterator, Optional
+
+from .config import settings
+
+# Silence-producing backend that imitates the timing and memory profile of a
+# real engine, so the web tier can be capacity-planned without GPUs/models.
+# Select a preset with MOCK_PROFILE and override single knobs with MOCK_*.
+
+SAMPLE_RATE = 24000
+CHUNK_FRAMES = 2400  # 0.1 s per yielded chunk
+
+
+@dataclass(frozen=True)
+class MockProfile:
+    rtf: float = 0.0  # synthesis seconds per audio second
+    first_chunk_s: float = 0.0  # extra latency before the first chunk
+    jitter: float = 0.0  # +/- fraction applied to every delay
+    memory_mb: int = 0  # working memory held while a synthesis runs
+    streaming: bool = True  # False: all audio arrives after the full synthesis time
+
+
+PROFILES: dict[str, MockProfile] = {
+    # Former behaviour: silence as fast as it can be written
+    "instant": MockProfile(),
+    # Orpheus 3B on a single GPU: streams faster than real time
+    "orpheus": MockProfile(rtf=0.5, first_chunk_s=0.3, jitter=0.15, memory_mb=300),
+    # Piper on CPU: fast, but the WAV only exists once the process exits
+    "piper": MockProfile(rtf=0.08, first_chunk_s=0.15, jitter=0.1, memory_mb=80, streaming=False),
+    # Parler mini on CPU: slower than real time, whole chunk at once
+    "parler": MockProfile(rtf=2.5, first_chunk_s=0.5, jitter=0.2, memory_mb=600, streaming=False),
+}
+
+
+def mock_profile(name: Optional[str] = None) -> MockProfile:
+    """Preset `name` (default MOCK_PROFILE) with MOCK_* overrides applied."""
+    key = (name or settings.mock_profile).lower()
+    base = PROFILES.get(key)
+    if base is None:
+        print(f"[WARN] Unknown MOCK_PROFILE '{key}'; using 'instant'")
+        base = PROFILES["instant"]
+    overrides = {}
+    if settings.mock_rtf is not None:
+        overrides["rtf"] = settings.mock_rtf
+    if settings.mock_first_chunk_ms is not None:
+        overrides["first_chunk_s"] = settings.mock_first_chunk_ms / 1000.0
+    if settings.mock_jitter is not None:
+        overrides["jitter"] = settings.mock_jitter
+    if settings.mock_memory_mb is not None:
+        overrides["memory_mb"] = settings.mock_memory_mb
+    return replace(base, **overrides)
+
+
+def mock_duration(text: str) -> float:
+    """Audio length the mock produces for `text` (~80 characters per 0.25 s)."""
+    return max(0.25, 0.25 * (len(text) / 80.0))
+
+
+def _ballast(memory_mb: int) -> Optional[bytearray]:
+    if memory_mb <= 0:
+        return None
+    buf = bytearray(memory_mb << 20)
+    buf[::4096] = b"\x01" * len(range(0, len(buf), 4096))  # touch every page so it is resident
+    return buf
+
+
+def mock_stream(text: str, profile: Optional[MockProfile] = None) -> Iterator[bytes]:
+    """Yield 16-bit mono silence at 24 kHz, paced according to `profile`."""
+    profile = profile or mock_profile()
+    rng = random.Random()
+
+    def wait(seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(max(0.0, seconds * (1.0 + rng.uniform(-profile.jitter, profile.jitter))))
+
+    total_frames = int(SAMPLE_RATE * mock_duration(text))
+    n_chunks = -(-total_frames // CHUNK_FRAMES)
+    chunk_s = CHUNK_FRAMES / float(SAMPLE_RATE)
+    silence_chunk = b"\x00\x00" * CHUNK_FRAMES
+    ballast = _ballast(profile.memory_mb)
+    try:
+        wait(profile.first_chunk_s)
+        if not profile.streaming:
+            wait(n_chunks * chunk_s * profile.rtf)
+        for _ in range(n_chunks):
+            if profile.streaming:
+                wait(chunk_s * profile.rtf)
+            yield silence_chunk
+    finally:
+        del ballast
@@ -1,14 +1,245 @@
 from __future__ import annotations
 
+import contextvars
+import queue
+import shutil
+import tempfile
+import threading
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
 from tqdm import tqdm
 
+from .calibration import resolve_max_chars
 from .config import settings
-from .text_extract import extract_text
-from .chunking import iter_chunks
-from .tts import OrpheusEngine, maybe_convert_to_mp3, write_stream_to_wav
+from .tracing import span, traced_iter
+from .text_extract import extract_text, iter_sections, pdf_page_count
+from .chunking import PlannedChunk, iter_blocks, iter_plan_chunks
+from .tts import Mp3Encoder, OrpheusEngine, maybe_convert_to_mp3, pcm16_bytes
+from .progress import ProgressCallback, ProgressTracker
+from .wav_assembly import WavAssembler, read_wav_layout
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .scheduler import Job
+    from .segments import SegmentWriter
+
+# Synthesis runs as three stages connected by bounded queues:
+#   text   - extraction (PDFs page by page) and chunk planning
+#   synth  - backend calls, one scheduler slot per chunk
+#   sink   - WAV writes, playlist segments and live MP3 encoding
+# Full queues block the stage upstream (backpressure), so memory stays flat
+# while the backend never waits on disk writes or encoding.
+
+_END = object()
+# Size estimate for classifying a PDF job before its text is extracted
+PDF_CHARS_PER_PAGE = 2000
+
+
+class SynthesisCancelled(RuntimeError):
+    """Raised when the caller's `cancel` event is set during synthesis."""
+
+
+class _Aborted(Exception):
+    """Another stage failed; unwind without reporting."""
+
+
+class _Channel:
+    """Bounded hand-off between two stages; both ends give up once a stage fails."""
+
+    def __init__(self, maxsize: int, failed: threading.Event):
+        self._q: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._failed = failed
+
+    def put(self, item) -> None:
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                self._q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def close(self) -> None:
+        self.put(_END)
+
+    def __iter__(self) -> Iterator:
+        while True:
+            if self._failed.is_set():
+                raise _Aborted()
+            try:
+                item = self._q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END:
+                return
+            yield item
+
+
+class _Stages:
+    """Threads for the upstream stages; the first failure wins and stops the rest."""
+
+    def __init__(self):
+        self.failed = threading.Event()
+        self.errors: list[BaseException] = []
+        self._threads: list[threading.Thread] = []
+
+    def channel(self, maxsize: int) -> _Channel:
+        return _Channel(maxsize, self.failed)
+
+    def start(self, name: str, fn: Callable[[], None]) -> None:
+        ctx = contextvars.copy_context()  # keeps the tracer binding on the new thread
+
+        def run() -> None:
+            try:
+                ctx.run(fn)
+            except _Aborted:
+                pass
+            except BaseException as e:
+                self.fail(e)
+
+        t = threading.Thread(target=run, name=f"{name}-{threading.current_thread().name}", daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def fail(self, e: BaseException) -> None:
+        self.errors.append(e)
+        self.failed.set()
+
+    def join(self) -> None:
+        for t in self._threads:
+            t.join()
+        if self.errors:
+            raise self.errors[0]
+
+
+@contextmanager
+def _slot(job: Optional["Job"], cost: int):
+    """Worker slot for one synthesis call when running under the web scheduler."""
+    if job is None:
+        yield
+        return
+    with ExitStack() as stack:
+        with span("slot wait", cat="sched", cost=cost):
+            stack.enter_context(job.slot(cost))
+        yield
+
+
+class _AudioSink:
+    """Last stage: the WAV file, playlist segments and (for MP3) a live encoder."""
+
+    def __init__(self, out_wav: Path, audio_format: str, segments: Optional["SegmentWriter"], tracker: ProgressTracker):
+        self.wav = WavAssembler(out_wav)
+        self.audio_format = audio_format
+        self.segments = segments
+        self.tracker = tracker
+        self.encoder: Optional[Mp3Encoder] = None
+        self._chunk_start = 0.0
+
+    @property
+    def framerate(self) -> Optional[int]:
+        return self.wav.framerate
+
+    def set_framerate(self, sr: int) -> None:
+        if self.wav.framerate is not None:
+            return
+        self.wav.set_framerate(sr)
+        if self.segments is not None:
+            self.segments.set_framerate(sr)
+        if self.audio_format == "mp3":
+            try:
+                self.encoder = Mp3Encoder(self.wav.path.with_suffix(".mp3"), sr)
+            except OSError as e:
+                print(f"[WARN] Live MP3 encoding unavailable ({e}). Converting after synthesis...")
+
+    def write(self, pcm: bytes | memoryview) -> None:
+        with span("write", cat="audio"):
+            self.wav.append_pcm(pcm)
+            self._forward(pcm)
+
+    def _forward(self, pcm: bytes | memoryview) -> None:
+        """Send PCM already in the WAV on to the playlist segments and the encoder."""
+        if self.segments is not None:
+            self.segments.write(pcm)
+        if self.encoder is not None:
+            try:
+                self.encoder.write(pcm)
+            except OSError as e:
+                print(f"[WARN] Live MP3 encoding failed ({e}). Converting after synthesis...")
+                self.encoder.abort()
+                self.encoder = None
+
+    def write_f32(self, audio, sr: int) -> None:
+        """Whole-chunk float32 audio (Parler without streaming)."""
+        import numpy as np  # type: ignore
+
+        self.set_framerate(sr)
+        # Resample if a chunk returned different SR (unlikely) — simplistic guard
+        if sr != self.framerate:
+            # naive resample via numpy (fallback) — keep simple to avoid extra deps
+            ratio = float(self.framerate) / float(sr)
+            idx = np.arange(0, len(audio) * ratio, ratio)
+            idx = idx[idx < len(audio)].astype(np.int64)
+            audio = audio[idx]
+        self.write(pcm16_bytes(audio))
+
+    def write_silence(self, seconds: float) -> None:
+        if seconds <= 0 or not self.framerate:
+            return
+        with span("write", cat="audio", silence_s=seconds):
+            start = self.wav.data_size
+            self.wav.append_silence(seconds)
+            if self.segments is not None or self.encoder is not None:
+                self._forward(bytes(self.wav.data_size - start))
+
+    def write_wav(self, part: Path) -> None:
+        """Splice a chunk rendered to a WAV file (Piper/pyttsx3), then delete it."""
+        with span("write", cat="audio"):
+            layout = read_wav_layout(part)
+            self.set_framerate(layout.framerate)
+            self.wav.append_wav(part)
+            if self.segments is not None or self.encoder is not None:
+                with part.open("rb") as f:
+                    f.seek(layout.data_offset)
+                    remaining = layout.data_size
+                    while remaining:
+                        block = f.read(min(remaining, 1 << 20))
+                        if not block:
+                            break
+                        remaining -= len(block)
+                        self._forward(block)
+        part.unlink(missing_ok=True)
+
+    def end_chunk(self, chars: int, pause_s: float) -> None:
+        """Append the planned silence and report the chunk as done."""
+        # Planned pauses are written as silence instead of being synthesized
+        self.write_silence(pause_s)
+        now = self.wav.seconds_written
+        self.tracker.chunk_done(chars, now - self._chunk_start)
+        self._chunk_start = now
+
+    def finish(self) -> Path:
+        self.wav.close()
+        if self.segments is not None:
+            self.segments.close()
+        if self.encoder is not None:
+            try:
+                with span("encode mp3", cat="encode"):
+                    mp3 = self.encoder.close()
+            except RuntimeError as e:
+                print(f"[WARN] {e}. Converting after synthesis...")
+            else:
+                self.wav.path.unlink(missing_ok=True)
+                return mp3
+        return maybe_convert_to_mp3(self.wav.path, audio_format=self.audio_format)
+
+    def abort(self) -> None:
+        self.wav.close()
+        if self.segments is not None:
+            self.segments.abort()  # ends the playlist so players stop polling
+        if self.encoder is not None:
+            self.encoder.abort()
 
 
 def synthesize_document(
@@ -16,90 +247,235 @@ def synthesize_document(
     voice: Optional[str] = None,
     temperature: Optional[float] = None,
     repetition_penalty: Optional[float] = None,
-    max_chars: int = 1500,
+    max_chars: Optional[int] = None,
     backend: Optional[str] = None,
     audio_format: Optional[str] = None,
+    job: Optional["Job"] = None,
+    segments: Optional["SegmentWriter"] = None,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    chunk_mode: Optional[str] = None,
+    out_wav: Optional[str | Path] = None,
 ) -> Path:
     """Extract text and synthesize an audio file (WAV/MP3 depending on config).
 
-    Returns the output path.
+    Extraction overlaps synthesis: PDFs are read page by page while earlier
+    chunks are being synthesized (progress reports `"planning": true` until
+    the whole document has been planned). An unclassified scheduler `job` is
+    classified from the page count for PDFs (PDF_CHARS_PER_PAGE each); other
+    formats are extracted whole anyway, so their exact size is used.
+
+    When `job` is given, every synthesis call waits for a scheduler slot so
+    concurrent documents share the workers fairly. When `segments` is given,
+    audio is also cut into playlist segments as it is produced. `progress`
+    receives a dict after every chunk (see app/progress.py). Setting `cancel`
+    stops synthesis at the next audio piece with SynthesisCancelled.
+
+    Without `max_chars` the chunk length comes from the backend's calibration
+    profile for `chunk_mode` (CHUNK_MODE by default, see app/calibration.py).
+
+    `out_wav` defaults to OUTPUT_DIR/<stem>.wav. Returns the output path.
     """
     p = Path(path)
-    text = extract_text(p)
-    # Choose chunk length; Parler is heavy on CPU, keep chunks smaller
-    local_max = max_chars
-    if engine.backend == "parler":
-        local_max = min(max_chars, 300)
-    chunks = list(iter_chunks(text, max_chars=local_max))
-    if not chunks:
-        raise RuntimeError("No text extracted from the document.")
+    out_wav = Path(out_wav) if out_wav is not None else Path(settings.output_dir) / f"{p.stem}.wav"
+    kwargs = dict(
+        voice=voice,
+        temperature=temperature,
+        repetition_penalty=repetition_penalty,
+        max_chars=max_chars,
+        backend=backend,
+        audio_format=audio_format,
+        job=job,
+        segments=segments,
+        progress=progress,
+        cancel=cancel,
+        chunk_mode=chunk_mode,
+    )
+    if job is not None and job.priority is None:
+        if p.suffix.lower() != ".pdf":
+            return synthesize_text(extract_text(p), out_wav, **kwargs)
+        job.classify(pdf_page_count(p) * PDF_CHARS_PER_PAGE)
+    return _synthesize(iter_sections(p), out_wav, planned=False, **kwargs)
 
-    engine = OrpheusEngine.instance(force_backend=backend)
 
-    base = p.stem
-    out_wav = Path(settings.output_dir) / f"{base}.wav"
-
-    if engine.backend in {"pyttsx3", "piper"}:
-        # Non-streaming path: synthesize whole text at once
-        full_text = " ".join(
-            (c if c.endswith((".", "!", "?", ":")) else c + ".")
-            for c in chunks
-        )
-        out_path = engine.synthesize_to_wav(full_text, out_wav, voice=voice)
-        return maybe_convert_to_mp3(out_path, audio_format=audio_format)
-    elif engine.backend == "parler":
-        # Generate per-chunk audio and append to a single WAV for faster, predictable latency
-        import numpy as np  # type: ignore
-        import wave
-        out_wav.parent.mkdir(parents=True, exist_ok=True)
-        # First chunk determines sample rate
-        sr = None
-        with wave.open(out_wav.as_posix(), "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)  # 16-bit PCM
-            for i, ch in enumerate(chunks):
-                ch_text = ch.strip()
-                if not ch_text:
-                    continue
-                if not ch_text.endswith((".", "!", "?", ":")):
-                    ch_text += "."
-                audio_f32, this_sr = engine.parler_generate_audio(ch_text, voice=voice)
-                if sr is None:
-                    sr = this_sr
-                    wf.setframerate(sr)
-                # Resample if a chunk returned different SR (unlikely) — simplistic guard
-                if this_sr != sr:
-                    # naive resample via numpy (fallback) — keep simple to avoid extra deps
-                    ratio = float(sr) / float(this_sr)
-                    idx = np.arange(0, len(audio_f32) * ratio, ratio)
-                    idx = idx[idx < len(audio_f32)].astype(np.int64)
-                    audio_f32 = audio_f32[idx]
-                # Convert to int16 PCM and write
-                pcm = np.clip(audio_f32, -1.0, 1.0)
-                pcm = (pcm * 32767.0).astype(np.int16).tobytes()
-                wf.writeframes(pcm)
-        return maybe_convert_to_mp3(out_wav, audio_format=audio_format)
+def synthesize_text(
+    text: str,
+    out_wav: str | Path,
+    voice: Optional[str] = None,
+    temperature: Optional[float] = None,
+    repetition_penalty: Optional[float] = None,
+    max_chars: Optional[int] = None,
+    backend: Optional[str] = None,
+    audio_format: Optional[str] = None,
+    job: Optional["Job"] = None,
+    segments: Optional["SegmentWriter"] = None,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[threading.Event] = None,
+    chunk_mode: Optional[str] = None,
+) -> Path:
+    """Synthesize already-extracted `text` to `out_wav` (converted to MP3 if requested).
+
+    See `synthesize_document` for `max_chars`, `job`, `segments`, `progress`
+    and `cancel`.
+    Returns the output path.
+    """
+    if job is not None:
+        job.classify(len(text))
+    return _synthesize(
+        [text],
+        out_wav,
+        planned=True,
+        voice=voice,
+        temperature=temperature,
+        repetition_penalty=repetition_penalty,
+        max_chars=max_chars,
+        backend=backend,
+        audio_format=audio_format,
+        job=job,
+        segments=segments,
+        progress=progress,
+        cancel=cancel,
+        chunk_mode=chunk_mode,
+    )
+
+
+def _check_cancel(cancel: Optional[threading.Event]) -> None:
+    if cancel is not None and cancel.is_set():
+        raise SynthesisCancelled("Synthesis cancelled")
+
+
+def _synthesize(
+    sections: Iterable[str],
+    out_wav: str | Path,
+    planned: bool,
+    voice: Optional[str],
+    temperature: Optional[float],
+    repetition_penalty: Optional[float],
+    max_chars: Optional[int],
+    backend: Optional[str],
+    audio_format: Optional[str],
+    job: Optional["Job"],
+    segments: Optional["SegmentWriter"],
+    progress: Optional[ProgressCallback],
+    cancel: Optional[threading.Event] = None,
+    chunk_mode: Optional[str] = None,
+) -> Path:
+    """Plan `sections` into chunks and run them through the stages.
+
+    With `planned=True` the plan is built up front (exact progress totals);
+    otherwise it is consumed lazily by the text stage.
+    """
+    out_wav = Path(out_wav)
+    fmt = (audio_format or settings.audio_format).lower()
+    engine = OrpheusEngine.instance(force_backend=backend)
+    # Choose chunk length; Parler is heavy on CPU, keep chunks smaller
+    local_max = resolve_max_chars(engine.backend, max_chars, chunk_mode)
+    if engine.backend == "parler":
+        local_max = min(local_max, settings.parler_max_chars)
+    plan: Iterable[PlannedChunk] = iter_plan_chunks(
+        iter_blocks(sections),
+        max_chars=local_max,
+        min_chars=min(settings.min_chunk_chars, local_max),
+        paragraph_pause_s=settings.pause_paragraph_ms / 1000.0,
+        heading_pause_s=settings.pause_heading_ms / 1000.0,
+        page_pause_s=settings.pause_page_ms / 1000.0,
+    )
+    if planned:
+        with span("plan chunks", cat="text") as info:
+            plan = list(plan)
+            if info is not None:
+                info["chunks"] = len(plan)
+                info["max_chars"] = local_max
+        if not plan:
+            raise RuntimeError("No text extracted from the document.")
+        tracker = ProgressTracker(len(plan), sum(len(c.text) for c in plan), progress)
     else:
-        # Streaming path (orpheus or mock)
+        tracker = ProgressTracker(None, 0, progress)
+    tracker.start()
+
+    # pyttsx3/Piper render each chunk to a WAV part (one slot per chunk, so a
+    # long document never holds a worker for its whole run); Parler without
+    # PARLER_STREAM returns whole chunks; every other backend streams
+    wav_parts = engine.backend in {"pyttsx3", "piper"}
+    whole_chunks = engine.backend == "parler" and not settings.parler_stream
+    parts_dir: Optional[Path] = None
+    if wav_parts:
         out_wav.parent.mkdir(parents=True, exist_ok=True)
-        import wave
-        with wave.open(out_wav.as_posix(), "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(24000)
-
-            for i in tqdm(range(len(chunks)), desc="Synthesis", unit="block"):
-                ch_text = chunks[i].strip()
-                if not ch_text.endswith((".", "!", "?", ":")):
-                    ch_text += "."
-                stream = engine.synth_stream(
-                    ch_text,
-                    voice=voice,
-                    temperature=temperature,
-                    repetition_penalty=repetition_penalty,
-                )
-                for audio_chunk in stream:
-                    wf.writeframes(audio_chunk)
-
-        final = maybe_convert_to_mp3(out_wav, audio_format=audio_format)
-        return final
+        parts_dir = Path(tempfile.mkdtemp(prefix=f".{out_wav.stem}.parts_", dir=out_wav.parent))
+    stages = _Stages()
+    text_q = stages.channel(settings.pipeline_text_queue)
+    audio_q = stages.channel(settings.pipeline_audio_queue)
+
+    def text_stage() -> None:
+        n = 0
+        for ch in plan:
+            if tracker.planning:
+                tracker.add_planned(len(ch.text))
+            text_q.put(ch)
+            n += 1
+        tracker.planned_all()
+        if n == 0:
+            raise RuntimeError("No text extracted from the document.")
+        text_q.close()
+
+    def synth_stage() -> None:
+        total = None if tracker.planning else tracker.chunks_total
+        for i, ch in enumerate(tqdm(text_q, desc="Synthesis", unit="block", total=total)):
+            _check_cancel(cancel)
+            with span("chunk", cat="synth", index=i, chars=len(ch.text), pause_s=ch.pause_s):
+                with _slot(job, len(ch.text)):
+                    _check_cancel(cancel)
+                    if wav_parts:
+                        part = parts_dir / f"part_{i:05d}.wav"
+                        with span("backend", cat="synth", backend=engine.backend):
+                            engine.synthesize_to_wav(ch.text, part, voice=voice)
+                        audio_q.put(("wav", part))
+                    elif whole_chunks:
+                        with span("backend", cat="synth", backend="parler"):
+                            audio_f32, sr = engine.parler_generate_audio(ch.text, voice=voice, cancel=cancel)
+                        _check_cancel(cancel)
+                        audio_q.put(("f32", audio_f32, sr))
+                    else:
+                        stream = engine.synth_stream(
+                            ch.text,
+                            voice=voice,
+                            temperature=temperature,
+                            repetition_penalty=repetition_penalty,
+                            cancel=cancel,
+                        )
+                        # "backend" spans: time blocked waiting for the model's next frames
+                        for pcm in traced_iter(stream, "backend", cat="synth"):
+                            _check_cancel(cancel)
+                            audio_q.put(("pcm", pcm))
+                        _check_cancel(cancel)  # Parler may end a cancelled chunk early
+            audio_q.put(("end", len(ch.text), ch.pause_s))
+        audio_q.close()
+
+    sink = _AudioSink(out_wav, fmt, segments, tracker)
+    if not (wav_parts or whole_chunks):
+        sink.set_framerate(engine.stream_sample_rate())
+    stages.start("text", text_stage)
+    stages.start("synth", synth_stage)
+    try:
+        for item in audio_q:
+            kind = item[0]
+            if kind == "pcm":
+                sink.write(item[1])
+            elif kind == "f32":
+                sink.write_f32(item[1], item[2])
+            elif kind == "wav":
+                sink.write_wav(item[1])
+            else:
+                sink.end_chunk(item[1], item[2])
+    except _Aborted:
+        pass
+    except BaseException as e:
+        stages.fail(e)
+    if stages.failed.is_set():
+        sink.abort()
+    try:
+        stages.join()
+    finally:
+        if parts_dir is not None:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+    return sink.finish()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .pipeline import synthesize_text
+from .scheduler import Job, scheduler
+from .tts import OrpheusEngine
+
+# Short voice auditions, cached on disk by (backend, model, voice, params, text).
+# Keys come from client input, so both the render locks (a fixed set, picked by
+# key hash) and the cache (least recently used entries beyond
+# PREVIEW_CACHE_MAX_FILES are deleted) stay bounded. Previews being served are
+# pinned and renders in progress (*.part.*) are never evicted.
+
+_key_locks = [threading.Lock() for _ in range(64)]
+_pins: Counter[str] = Counter()  # keys of previews being served
+_pins_guard = threading.Lock()
+
+
+def preview_key(
+    text: str,
+    engine: OrpheusEngine,
+    voice: Optional[str],
+    temperature: float,
+    repetition_penalty: float,
+    audio_format: str,
+) -> str:
+    ident = {
+        "backend": engine.backend,
+        "model": engine.model_id(voice),
+        "voice": voice or settings.voice or "",
+        "temperature": round(float(temperature), 4),
+        "repetition_penalty": round(float(repetition_penalty), 4),
+        "format": audio_format,
+        "text": text,
+    }
+    raw = json.dumps(ident, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    return _key_locks[int(key[:8], 16) % len(_key_locks)]
+
+
+def _pin(key: str) -> None:
+    with _pins_guard:
+        _pins[key] += 1
+
+
+def release_preview(path: Path) -> None:
+    """Unpin a preview returned by `get_preview` once it has been served."""
+    key = path.name.split(".", 1)[0]
+    with _pins_guard:
+        _pins[key] -= 1
+        if _pins[key] <= 0:
+            del _pins[key]
+
+
+def _cached(cache_dir: Path, key: str) -> Optional[Path]:
+    """Pinned cached preview for `key`, or None."""
+    _pin(key)
+    for ext in ("wav", "mp3"):
+        p = cache_dir / f"{key}.{ext}"
+        try:
+            os.utime(p)  # mtime doubles as last use for eviction
+        except FileNotFoundError:
+            continue
+        return p
+    release_preview(cache_dir / key)
+    return None
+
+
+def _evict(cache_dir: Path, keep: Path) -> None:
+    """Delete the least recently used previews beyond PREVIEW_CACHE_MAX_FILES.
+
+    Renders in progress (`<key>.part.<ext>`) and pinned previews are skipped.
+    """
+    entries = []
+    for p in cache_dir.iterdir():
+        if p == keep or p.suffix not in {".wav", ".mp3"} or ".part." in p.name:
+            continue
+        try:
+            entries.append((p.stat().st_mtime, p))
+        except FileNotFoundError:
+            pass
+    excess = len(entries) + 1 - max(1, settings.preview_cache_max_files)
+    for _, p in sorted(entries):
+        if excess <= 0:
+            break
+        with _pins_guard:
+            if _pins[p.name.split(".", 1)[0]] > 0:
+                continue
+            p.unlink(missing_ok=True)
+        excess -= 1
+
+
+def get_preview(
+    text: Optional[str] = None,
+    backend: Optional[str] = None,
+    voice: Optional[str] = None,
+    temperature: Optional[float] = None,
+    repetition_penalty: Optional[float] = None,
+    audio_format: str = "wav",
+    client: str = "anonymous",
+) -> tuple[Path, bool]:
+    """Return (path, cache_hit) for a short preview of the given voice settings.
+
+    Misses are rendered on the scheduler's preview class, which has reserved
+    slots and so never waits behind document chunks. The path is pinned
+    against eviction; call `release_preview(path)` once it has been served.
+
+    Raises:
+        ValueError: preview text is empty or too long
+    """
+    sentence = (text or settings.preview_text).strip()
+    if not sentence:
+        raise ValueError("Preview text is empty")
+    if len(sentence) > settings.preview_max_chars:
+        raise ValueError(f"Preview text longer than {settings.preview_max_chars} characters")
+    temperature = settings.temperature if temperature is None else temperature
+    repetition_penalty = settings.repetition_penalty if repetition_penalty is None else repetition_penalty
+    fmt = (audio_format or "wav").lower()
+
+    engine = OrpheusEngine.instance(force_backend=backend)
+    key = preview_key(sentence, engine, voice, temperature, repetition_penalty, fmt)
+    cache_dir = Path(settings.preview_cache_dir)
+    hit = _cached(cache_dir, key)
+    if hit is not None:
+        return hit, True
+
+    with _lock_for(key):
+        hit = _cached(cache_dir, key)
+        if hit is not None:
+            return hit, True
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        job: Job = scheduler.open_job(client, priority="preview")
+        part = synthesize_text(
+            sentence,
+            cache_dir / f"{key}.part.wav",
+            voice=voice,
+            temperature=temperature,
+            repetition_penalty=repetition_penalty,
+            max_chars=settings.preview_max_chars,
+            backend=backend,
+            audio_format=fmt,
+            job=job,
+        )
+        final = cache_dir / f"{key}{part.suffix}"
+        _pin(key)
+        os.replace(part, final)
+        _evict(cache_dir, keep=final)
+        return final, False
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+# Structured per-chunk progress for a synthesis run. The pipeline reports each
+# finished chunk; listeners receive plain dicts (JSON-ready, used for SSE).
+
+ProgressCallback = Callable[[dict], None]
+
+
+class ProgressTracker:
+    """Per-run counters; `chunks_total=None` means the plan is still growing.
+
+    While a document is still being extracted, the text stage reports each
+    planned chunk with `add_planned` and snapshots carry `"planning": true`.
+    """
+
+    def __init__(self, chunks_total: Optional[int], chars_total: int = 0, callback: Optional[ProgressCallback] = None):
+        self.planning = chunks_total is None
+        self.chunks_total = chunks_total or 0
+        self.chars_total = chars_total
+        self.callback = callback
+        self.chunks_done = 0
+        self.chars_done = 0
+        self.audio_seconds = 0.0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self._emit()
+
+    def add_planned(self, chars: int) -> None:
+        with self._lock:
+            self.chunks_total += 1
+            self.chars_total += chars
+
+    def planned_all(self) -> None:
+        self.planning = False
+
+    def chunk_done(self, chars: int, audio_seconds: float) -> None:
+        with self._lock:
+            self.chunks_done += 1
+            self.chars_done += chars
+            self.audio_seconds += audio_seconds
+        self._emit()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            rtf = elapsed / self.audio_seconds if self.audio_seconds > 0 else None
+            eta = None
+            if self.chars_done:
+                eta = elapsed / self.chars_done * max(0, self.chars_total - self.chars_done)
+            return {
+                "type": "progress",
+                "chunks_done": self.chunks_done,
+                "chunks_total": self.chunks_total,
+                "planning": self.planning,
+                "audio_seconds": round(self.audio_seconds, 3),
+                "elapsed_s": round(elapsed, 3),
+                "rtf": round(rtf, 4) if rtf is not None else None,
+                "eta_s": round(eta, 1) if eta is not None else None,
+            }
+
+    def _emit(self) -> None:
+        if self.callback is not None:
+            self.callback(self.snapshot())
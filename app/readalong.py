@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .chunking import SENT_SPLIT, plan_chunks
+from .config import settings
+from .pipeline import SynthesisCancelled, synthesize_text
+from .scheduler import Job
+from .tts import OrpheusEngine, maybe_convert_to_mp3
+from .wav_assembly import read_wav_layout
+
+# Read-along sessions: a document is uploaded once and split into chunks;
+# clients then ask for audio at any chunk. Only the requested chunk and a
+# lookahead window after it are synthesized; a jump cancels the in-flight
+# render if it falls outside the new window.
+
+
+@dataclass
+class SessionChunk:
+    index: int
+    text: str
+    pause_s: float  # silence the client should leave after this chunk
+    sentences: list[str]
+    status: str = "pending"  # pending | rendering | ready | error
+    path: Optional[Path] = None
+    duration_s: Optional[float] = None
+    error: Optional[str] = None
+
+    def sentence_times(self) -> Optional[list[dict]]:
+        """Per-sentence [start_s, end_s) within the chunk audio.
+
+        Backends report no alignments, so the chunk duration is spread over
+        the sentences by character count (good enough for highlighting).
+        """
+        if self.duration_s is None:
+            return None
+        total = sum(len(s) for s in self.sentences) or 1
+        times, t = [], 0.0
+        for i, s in enumerate(self.sentences):
+            end = t + self.duration_s * len(s) / total
+            times.append({"index": i, "start_s": round(t, 3), "end_s": round(end, 3)})
+            t = end
+        return times
+
+    def to_dict(self, session_id: str, include_text: bool = True) -> dict:
+        d = {
+            "index": self.index,
+            "status": self.status,
+            "pause_s": self.pause_s,
+            "duration_s": None if self.duration_s is None else round(self.duration_s, 3),
+            "audio": f"/api/readalong/{session_id}/chunks/{self.index}/audio" if self.status == "ready" else None,
+            "error": self.error,
+        }
+        times = self.sentence_times()
+        if include_text:
+            d["sentences"] = [
+                {"index": i, "text": s, **({"start_s": times[i]["start_s"], "end_s": times[i]["end_s"]} if times else {})}
+                for i, s in enumerate(self.sentences)
+            ]
+        elif times is not None:
+            d["sentences"] = times
+        return d
+
+
+@dataclass
+class SessionOptions:
+    backend: Optional[str] = None
+    voice: Optional[str] = None
+    temperature: Optional[float] = None
+    repetition_penalty: Optional[float] = None
+    audio_format: str = "wav"
+
+
+class ReadAlongSession:
+    def __init__(self, id: str, workdir: Path, chunks: list[SessionChunk], options: SessionOptions, job: Job, lookahead: int):
+        self.id = id
+        self.workdir = workdir
+        self.chunks = chunks
+        self.options = options
+        self.job = job
+        self.lookahead = max(0, lookahead)
+        self.position = 0
+        self.created = time.time()
+        self.last_access = self.created
+        self.closed = False
+        self._wanted: list[int] = []
+        self._current: Optional[int] = None
+        self._cancel = threading.Event()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"readalong-{id[:8]}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def seek(self, index: int) -> None:
+        """Move the listener to `index`: render it and the lookahead window, drop the rest."""
+        if not 0 <= index < len(self.chunks):
+            raise IndexError(f"Chunk {index} out of range (0..{len(self.chunks) - 1})")
+        with self._cond:
+            self.position = index
+            self.last_access = time.time()
+            window = range(index, min(len(self.chunks), index + 1 + self.lookahead))
+            self._wanted = [
+                i for i in window
+                if self.chunks[i].status == "pending" or (i == index and self.chunks[i].status == "error")
+            ]
+            if self._current is not None and self._current not in window:
+                self._cancel.set()
+            self._cond.notify_all()
+
+    def wait_ready(self, index: int, timeout: float) -> SessionChunk:
+        self.seek(index)
+        chunk = self.chunks[index]
+        with self._cond:
+            self._cond.wait_for(lambda: chunk.status in {"ready", "error"} or self.closed, timeout=timeout)
+        return chunk
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cancel.set()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._wanted or self.closed)
+                if self.closed:
+                    return
+                chunk = self.chunks[self._wanted.pop(0)]
+                if chunk.status in {"ready", "rendering"}:
+                    continue
+                chunk.status = "rendering"
+                chunk.error = None
+                self._current = chunk.index
+                self._cancel = cancel = threading.Event()
+            try:
+                path, duration = self._render(chunk, cancel)
+            except SynthesisCancelled:
+                status, path, duration, error = "pending", None, None, None
+            except Exception as e:
+                traceback.print_exc()
+                status, path, duration, error = "error", None, None, str(e) or e.__class__.__name__
+            else:
+                status, error = "ready", None
+            with self._cond:
+                chunk.path, chunk.duration_s, chunk.error = path, duration, error
+                chunk.status = status
+                self._current = None
+                self._cond.notify_all()
+
+    def _render(self, chunk: SessionChunk, cancel: threading.Event) -> tuple[Path, float]:
+        o = self.options
+        wav = synthesize_text(
+            chunk.text,
+            self.workdir / f"chunk_{chunk.index:05d}.wav",
+            voice=o.voice,
+            temperature=o.temperature,
+            repetition_penalty=o.repetition_penalty,
+            max_chars=max(len(chunk.text), 1),
+            backend=o.backend,
+            audio_format="wav",
+            job=self.job,
+            cancel=cancel,
+        )
+        duration = read_wav_layout(wav).seconds
+        return maybe_convert_to_mp3(wav, audio_format=o.audio_format), duration
+
+    def to_dict(self, include_text: bool = False) -> dict:
+        return {
+            "id": self.id,
+            "position": self.position,
+            "lookahead": self.lookahead,
+            "chunks_total": len(self.chunks),
+            "chunks_ready": sum(1 for c in self.chunks if c.status == "ready"),
+            "chunks": [c.to_dict(self.id, include_text=include_text) for c in self.chunks],
+        }
+
+
+class ReadAlongRegistry:
+    def __init__(self, root: str | Path, ttl_s: int):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self._sessions: dict[str, ReadAlongSession] = {}
+        self._lock = threading.Lock()
+
+    def create(self, text: str, options: SessionOptions, job: Job, max_chars: int) -> ReadAlongSession:
+        """Plan `text` into chunks (no synthesis yet) and open a session."""
+        self.prune()
+        engine = OrpheusEngine.instance(force_backend=options.backend)
+        if engine.backend == "parler":
+            max_chars = min(max_chars, settings.parler_max_chars)
+        plan = plan_chunks(
+            text,
+            max_chars=max_chars,
+            min_chars=min(settings.min_chunk_chars, max_chars),
+            paragraph_pause_s=settings.pause_paragraph_ms / 1000.0,
+            heading_pause_s=settings.pause_heading_ms / 1000.0,
+            page_pause_s=settings.pause_page_ms / 1000.0,
+        )
+        if not plan:
+            raise ValueError("No text extracted from the document.")
+        chunks = [
+            SessionChunk(i, c.text, c.pause_s, [s.strip() for s in SENT_SPLIT.split(c.text) if s.strip()])
+            for i, c in enumerate(plan)
+        ]
+        session_id = uuid.uuid4().hex
+        workdir = self.root / session_id
+        workdir.mkdir(parents=True, exist_ok=True)
+        session = ReadAlongSession(session_id, workdir, chunks, options, job, settings.readalong_lookahead)
+        with self._lock:
+            self._sessions[session_id] = session
+        session.start()
+        session.seek(0)  # listeners nearly always start at the top
+        return session
+
+    def get(self, session_id: str) -> Optional[ReadAlongSession]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_access = time.time()
+        return session
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        shutil.rmtree(session.workdir, ignore_errors=True)
+        return True
+
+    def prune(self) -> None:
+        """Close sessions nobody has touched for the TTL."""
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            stale = [s.id for s in self._sessions.values() if s.last_access < cutoff]
+        for session_id in stale:
+            self.close(session_id)
+
+
+sessions = ReadAlongRegistry(settings.readalong_dir, settings.readalong_ttl_s)
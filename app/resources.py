@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from .config import settings
+
+# CPU thread budget shared by torch, OpenMP/BLAS and external engines (Piper).
+#
+# CPU_BUDGET cores are split evenly across the WORKERS scheduler slots. torch
+# and OpenMP/BLAS are told to use `threads_per_worker` threads. Piper's
+# onnxruntime reads no thread-count environment variable, so it is only held to
+# a worker's share with CPU_PIN=1: the thread running slot i is pinned to its
+# own core range and child processes inherit that affinity. Reserved preview
+# slots share the whole budget unpinned.
+
+_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+
+def _available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+@dataclass
+class ThreadAllocation:
+    budget: int
+    workers: int
+    threads_per_worker: int
+    pin: bool
+    cpus: list[int] = field(default_factory=list)
+    worker_cpus: dict[int, list[int]] = field(default_factory=dict)
+
+
+def plan_allocation(budget: Optional[int] = None, workers: Optional[int] = None, pin: Optional[bool] = None) -> ThreadAllocation:
+    available = _available_cpus()
+    budget = min(max(1, budget or settings.cpu_budget or len(available)), len(available))
+    workers = max(1, workers or settings.workers)
+    per_worker = max(1, budget // workers)
+    pin = settings.cpu_pin if pin is None else pin
+    cpus = available[:budget]
+    worker_cpus: dict[int, list[int]] = {}
+    if pin and hasattr(os, "sched_setaffinity"):
+        for i in range(workers):
+            lo = (i * per_worker) % len(cpus)
+            worker_cpus[i] = cpus[lo : lo + per_worker] or cpus
+    return ThreadAllocation(budget, workers, per_worker, bool(worker_cpus), cpus, worker_cpus)
+
+
+allocation = plan_allocation()
+_torch_configured = False
+_torch_lock = threading.Lock()
+
+
+def apply_process_env() -> None:
+    """Set per-worker thread counts for OpenMP/BLAS before they are imported.
+
+    Explicit environment values win (setdefault), like the device defaults in tts.py.
+    """
+    for var in _THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(allocation.threads_per_worker))
+
+
+def configure_torch(threads: Optional[int] = None) -> None:
+    """Size torch's intra-op pool once (it is process-wide, not per thread).
+
+    The first call wins, so scripts that choose their own thread count call
+    this before loading Parler instead of torch.set_num_threads.
+    """
+    global _torch_configured
+    with _torch_lock:
+        if _torch_configured:
+            return
+        import torch
+
+        torch.set_num_threads(threads or allocation.threads_per_worker)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # already set once torch started parallel work
+        _torch_configured = True
+
+
+def pin_current_thread(slot: Optional[int]) -> None:
+    """Pin the calling thread to `slot`'s cores, or back to the whole budget."""
+    if not allocation.pin:
+        return
+    cpus = allocation.worker_cpus.get(slot, allocation.cpus) if slot is not None else allocation.cpus
+    try:
+        os.sched_setaffinity(0, cpus)  # pid 0 = calling thread on Linux
+    except OSError:
+        pass
+
+
+def subprocess_env() -> dict[str, str]:
+    """Environment for external engines (Piper), with OpenMP/BLAS limited to one worker's share."""
+    env = dict(os.environ)
+    for var in _THREAD_ENV_VARS:
+        env[var] = str(allocation.threads_per_worker)
+    return env
+
+
+def report() -> dict:
+    return asdict(allocation)
+
+
+def describe() -> str:
+    a = allocation
+    pin = f", pinned {a.worker_cpus}" if a.pin else ""
+    return f"CPU budget {a.budget} cores across {a.workers} worker(s): {a.threads_per_worker} thread(s) each{pin}"
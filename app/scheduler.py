@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from . import resources
+from .config import settings
+
+# Chunk-granularity scheduler for concurrent synthesis jobs.
+#
+# Each synthesis call (one chunk, for every backend) asks for a worker slot.
+# Waiting calls are served by strict priority class, then by self-clocked
+# weighted fair queuing across clients: a call's finish tag is
+# max(V, client's last tag) + cost / weight, and the smallest tag wins.
+# A client never holds more than `per_client` document slots at once. Previews
+# also get `reserved` extra slots that document jobs can never occupy, and are
+# counted against `per_client` separately, so a client's own running chunk
+# never holds back its preview.
+
+PRIORITY_CLASSES = ("preview", "interactive", "bulk")
+_WAIT_SAMPLES = 1024
+
+
+@dataclass
+class Job:
+    """A document (or request) whose chunks are scheduled together."""
+
+    scheduler: "FairScheduler"
+    client: str
+    priority: Optional[str] = None
+    weight: float = 1.0
+    id: int = 0
+
+    def classify(self, total_chars: int) -> str:
+        """Pick a priority class from document size unless one was set explicitly."""
+        if self.priority is None:
+            small = total_chars <= settings.interactive_max_chars
+            self.priority = "interactive" if small else "bulk"
+        return self.priority
+
+    def slot(self, cost: float = 1.0):
+        return self.scheduler.slot(self, cost)
+
+
+@dataclass
+class _Waiter:
+    job: Job
+    tag: float
+    seq: int
+    enqueued: float
+    slot: Optional[int] = None
+
+
+@dataclass
+class _ClassStats:
+    waits: deque = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLES))
+    granted: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+class FairScheduler:
+    def __init__(self, slots: int = 1, per_client: int = 1, reserved: int = 0):
+        self.slots = max(1, int(slots))
+        self.per_client = max(1, int(per_client))
+        self.reserved = max(0, int(reserved))
+        self._cond = threading.Condition()
+        self._free: list[int] = list(range(self.slots))
+        self._reserved_free: list[int] = list(range(self.slots, self.slots + self.reserved))
+        self._waiting: list[_Waiter] = []
+        self._active: Counter[str] = Counter()  # document slots held per client
+        self._preview_active: Counter[str] = Counter()
+        self._last_tag: dict[str, float] = {}
+        self._virtual = 0.0
+        self._seq = itertools.count()
+        self._job_ids = itertools.count(1)
+        self._stats = {cls: _ClassStats() for cls in PRIORITY_CLASSES}
+
+    def open_job(self, client: str, priority: Optional[str] = None, weight: float = 1.0) -> Job:
+        if priority is not None and priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        return Job(self, client=client or "anonymous", priority=priority, weight=max(weight, 1e-3), id=next(self._job_ids))
+
+    @contextmanager
+    def slot(self, job: Job, cost: float = 1.0) -> Iterator[int]:
+        """Block until `job` may run one unit of work; yields the worker slot index."""
+        if job.priority is None:
+            job.priority = "bulk"
+        with self._cond:
+            start = max(self._virtual, self._last_tag.get(job.client, 0.0))
+            tag = start + max(float(cost), 1.0) / job.weight
+            self._last_tag[job.client] = tag
+            waiter = _Waiter(job, tag, next(self._seq), time.perf_counter())
+            self._waiting.append(waiter)
+            while waiter.slot is None:
+                self._dispatch()
+                if waiter.slot is None:
+                    self._cond.wait()
+            waited = time.perf_counter() - waiter.enqueued
+            stats = self._stats[job.priority]
+            stats.waits.append(waited)
+            stats.granted += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+        resources.pin_current_thread(waiter.slot)
+        try:
+            yield waiter.slot
+        finally:
+            resources.pin_current_thread(None)
+            with self._cond:
+                if waiter.slot >= self.slots:
+                    self._reserved_free.append(waiter.slot)
+                else:
+                    self._free.append(waiter.slot)
+                active = self._holding(job)
+                active[job.client] -= 1
+                if active[job.client] <= 0:
+                    del active[job.client]
+                self._dispatch()
+
+    def _holding(self, job: Job) -> Counter:
+        return self._preview_active if job.priority == "preview" else self._active
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the best eligible waiters (caller holds the lock)."""
+        granted = False
+        while self._free or self._reserved_free:
+            eligible = [
+                w
+                for w in self._waiting
+                if self._holding(w.job)[w.job.client] < self.per_client
+                and (self._free or w.job.priority == "preview")
+            ]
+            if not eligible:
+                break
+            best = min(eligible, key=lambda w: (PRIORITY_CLASSES.index(w.job.priority), w.tag, w.seq))
+            self._waiting.remove(best)
+            if best.job.priority == "preview" and self._reserved_free:
+                best.slot = self._reserved_free.pop(0)
+            else:
+                best.slot = self._free.pop(0)
+            self._holding(best.job)[best.job.client] += 1
+            self._virtual = max(self._virtual, best.tag)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            waiting = Counter(w.job.priority for w in self._waiting)
+            classes = {}
+            for cls, st in self._stats.items():
+                samples = list(st.waits)
+                classes[cls] = {
+                    "waiting": waiting.get(cls, 0),
+                    "granted": st.granted,
+                    "wait_mean_s": (st.total_wait / st.granted) if st.granted else 0.0,
+                    "wait_p50_s": _percentile(samples, 0.50),
+                    "wait_p95_s": _percentile(samples, 0.95),
+                    "wait_max_s": st.max_wait,
+                }
+            return {
+                "slots": self.slots,
+                "busy": self.slots - len(self._free),
+                "reserved": self.reserved,
+                "reserved_busy": self.reserved - len(self._reserved_free),
+                "per_client": self.per_client,
+                "active_clients": dict(self._active),
+                "classes": classes,
+            }
+
+
+scheduler = FairScheduler(
+    slots=settings.workers,
+    per_client=settings.client_max_concurrency,
+    reserved=settings.preview_slots,
+)
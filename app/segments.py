@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import contextvars
+import math
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from . import tracing
+from .config import settings
+from .tts import find_ffmpeg
+
+# Segmented (HLS-style) output: fixed-duration audio segments plus an EVENT
+# playlist that is rewritten atomically as each segment lands, so listeners can
+# start, seek and resume while synthesis is still running.
+#
+# One ffmpeg process encodes the whole run to MP3; its output is cut into
+# segments on frame boundaries. Encoder priming/padding therefore only occurs
+# at the very start and end, never at segment boundaries, and the bit
+# reservoir is disabled so every frame decodes on its own after a cut.
+
+PLAYLIST_NAME = "index.m3u8"
+_ID3_TS_OWNER = b"com.apple.streaming.transportStreamTimestamp\x00"
+
+# MPEG audio layer III: bitrate (kbps) by index, sample rates by version bits
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+# Longest layer III frame (576 samples at 8 kHz): a cut overshoots SEGMENT_SECONDS by less
+_MAX_FRAME_S = 576 / 8000
+
+
+def _syncsafe(n: int) -> bytes:
+    return bytes(((n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F))
+
+
+def id3_timestamp_tag(start_seconds: float) -> bytes:
+    """ID3v2.4 PRIV tag carrying the 90 kHz start timestamp HLS packed audio requires."""
+    pts = int(round(start_seconds * 90000)) & ((1 << 33) - 1)
+    body = _ID3_TS_OWNER + pts.to_bytes(8, "big")
+    frame = b"PRIV" + _syncsafe(len(body)) + b"\x00\x00" + body
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frame)) + frame
+
+
+def mp3_frame_info(header: bytes) -> Optional[tuple[int, int, int]]:
+    """(frame length in bytes, samples, sample rate) of a layer III frame header, or None."""
+    if len(header) < 4:
+        return None
+    h = int.from_bytes(header[:4], "big")
+    version, layer = (h >> 19) & 3, (h >> 17) & 3
+    br_idx, sr_idx, padding = (h >> 12) & 0xF, (h >> 10) & 3, (h >> 9) & 1
+    if (h >> 21) != 0x7FF or version == 1 or layer != 1 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    rate = _SAMPLE_RATES[version][sr_idx]
+    if version == 3:
+        return 144 * _BITRATES_V1[br_idx] * 1000 // rate + padding, 1152, rate
+    return 72 * _BITRATES_V2[br_idx] * 1000 // rate + padding, 576, rate
+
+
+def segments_available() -> bool:
+    """Segmented output needs ffmpeg (HLS packed audio has no PCM/WAV form)."""
+    ffmpeg = find_ffmpeg()
+    return Path(ffmpeg).exists() or shutil.which(ffmpeg) is not None
+
+
+class SegmentWriter:
+    """Encode 16-bit mono PCM to MP3 and cut it into `segment_seconds` segments under `out_dir`.
+
+    `close()` flushes the last partial segment and ends the playlist; `abort()`
+    stops the encoder and ends the playlist with the segments already written.
+    """
+
+    def __init__(
+        self,
+        out_dir: str | Path,
+        segment_seconds: Optional[float] = None,
+        sample_rate: Optional[int] = None,
+        bitrate: Optional[str] = None,
+    ):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_seconds = float(segment_seconds or settings.segment_seconds)
+        # Fixed for the playlist's lifetime (RFC 8216 forbids changing it). Cuts
+        # land on frame boundaries, so segments run up to one frame long;
+        # EXTINF rounded to the nearest integer must not exceed it.
+        self.target_duration = max(1, math.floor(self.segment_seconds + _MAX_FRAME_S + 0.5))
+        self.bitrate = bitrate or settings.segment_bitrate
+        self.sample_rate: Optional[int] = None
+        self.segments: list[tuple[str, float]] = []
+        self.ended = False
+        self._proc: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._started = 0
+        self._pending = bytearray()  # encoder output not yet split into frames
+        self._frames = bytearray()  # frames of the segment being filled
+        self._seg_samples = 0
+        self._done_samples = 0  # samples in finished segments (next segment's start)
+        self._mp3_rate = 0
+        self._write_playlist()
+        if sample_rate is not None:
+            self.set_framerate(sample_rate)
+
+    @property
+    def playlist_path(self) -> Path:
+        return self.out_dir / PLAYLIST_NAME
+
+    def set_framerate(self, sample_rate: int) -> None:
+        if self.sample_rate is not None:
+            if self.sample_rate != sample_rate:
+                raise ValueError(f"Sample rate mismatch: {sample_rate} != {self.sample_rate}")
+            return
+        self.sample_rate = sample_rate
+        cmd = [
+            find_ffmpeg(), "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            "-c:a", "libmp3lame", "-b:a", self.bitrate, "-reservoir", "0",
+            "-write_xing", "0", "-id3v2_version", "0", "-f", "mp3", "pipe:1",
+        ]
+        self._started = time.perf_counter_ns()
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        ctx = contextvars.copy_context()  # segment spans go to the caller's tracer
+        self._reader = threading.Thread(target=ctx.run, args=(self._read_output,), name="hls-segmenter", daemon=True)
+        self._reader.start()
+
+    def write(self, pcm: bytes | bytearray | memoryview) -> None:
+        if self._proc is None or self._proc.stdin is None:
+            raise ValueError("Sample rate must be set before writing segments")
+        if self._error is not None:
+            raise RuntimeError(f"Segment encoder failed: {self._error}")
+        self._proc.stdin.write(pcm)
+
+    def close(self) -> None:
+        if self.ended:
+            return
+        returncode = self._stop(kill=False)
+        self._flush()
+        self._end()
+        if returncode:
+            raise RuntimeError(f"ffmpeg segment encoding failed (exit {returncode})")
+        if self._error is not None:
+            raise RuntimeError(f"Segment encoder failed: {self._error}")
+
+    def abort(self) -> None:
+        """Stop encoding and end the playlist at the last complete segment."""
+        if self.ended:
+            return
+        self._stop(kill=True)
+        self._end()
+
+    def _stop(self, kill: bool) -> Optional[int]:
+        proc = self._proc
+        if proc is None:
+            return None
+        if kill:
+            proc.kill()
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except OSError:
+            pass
+        if self._reader is not None:
+            self._reader.join()
+        returncode = proc.wait()
+        tracer = tracing.current()
+        if tracer is not None:
+            tracer.complete(
+                "ffmpeg", self._started, time.perf_counter_ns(), "subprocess",
+                {"cmd": "ffmpeg", "returncode": returncode}, pid=proc.pid, process_name=f"ffmpeg (pid {proc.pid})",
+            )
+        return None if kill else returncode
+
+    def _end(self) -> None:
+        self.ended = True
+        self._write_playlist()
+
+    def _read_output(self) -> None:
+        assert self._proc is not None and self._proc.stdout is not None
+        try:
+            while True:
+                data = self._proc.stdout.read1(64 * 1024)
+                if not data:
+                    break
+                self._pending += data
+                self._take_frames()
+        except BaseException as e:
+            self._error = e
+
+    def _take_frames(self) -> None:
+        buf = self._pending
+        pos = 0
+        while len(buf) - pos >= 4:
+            info = mp3_frame_info(buf[pos : pos + 4])
+            if info is None:
+                pos += 1  # resync on the next frame header
+                continue
+            length, samples, rate = info
+            if len(buf) - pos < length:
+                break
+            self._frames += buf[pos : pos + length]
+            self._seg_samples += samples
+            self._mp3_rate = rate
+            pos += length
+            if self._seg_samples >= self.segment_seconds * rate:
+                self._flush()
+        del buf[:pos]
+
+    def _flush(self) -> None:
+        if not self._frames:
+            return
+        with tracing.span("segment", cat="encode", index=len(self.segments)):
+            rate = float(self._mp3_rate)
+            duration = self._seg_samples / rate
+            data = id3_timestamp_tag(self._done_samples / rate) + bytes(self._frames)
+            name = f"seg_{len(self.segments):05d}.mp3"
+            tmp = self.out_dir / f".{name}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.out_dir / name)
+            self.segments.append((name, duration))
+            self._done_samples += self._seg_samples
+            self._frames.clear()
+            self._seg_samples = 0
+            self._write_playlist()
+
+    def _write_playlist(self) -> None:
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{self.target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for name, duration in self.segments:
+            lines.append(f"#EXTINF:{duration:.3f},")
+            lines.append(name)
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+        tmp = self.out_dir / f".{PLAYLIST_NAME}.tmp"
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.playlist_path)
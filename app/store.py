@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from .calibration import resolve_max_chars
+from .config import settings
+from .pipeline import synthesize_document
+from .tts import OrpheusEngine
+from .wav_assembly import copy_file
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .scheduler import Job
+
+# Content-addressed store of finished outputs, keyed by a hash of the document
+# bytes and everything that affects the audio. Entries expire after STORE_TTL_S
+# and the least recently used ones are evicted above STORE_MAX_BYTES. Entries
+# being served are pinned (acquire/release) and never deleted until released.
+
+
+@dataclass
+class StoredOutput:
+    key: str
+    path: Path
+    filename: str  # download name, e.g. "report.mp3"
+    created: float
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+
+def output_key(
+    doc_sha256: str,
+    engine: OrpheusEngine,
+    voice: Optional[str],
+    temperature: float,
+    repetition_penalty: float,
+    max_chars: int,
+    audio_format: str,
+) -> str:
+    ident = {
+        "doc": doc_sha256,
+        "backend": engine.backend,
+        "model": engine.model_id(voice),
+        "voice": voice or settings.voice or "",
+        "temperature": round(float(temperature), 4),
+        "repetition_penalty": round(float(repetition_penalty), 4),
+        "max_chars": int(max_chars),
+        "format": audio_format.lower(),
+    }
+    raw = json.dumps(ident, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class OutputStore:
+    def __init__(self, root: str | Path, ttl_s: int, max_bytes: int):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._locks = [threading.Lock() for _ in range(64)]  # picked by key hash, so bounded
+        self._pins: Counter[str] = Counter()  # entries being served
+        self._guard = threading.Lock()
+
+    def lock(self, key: str) -> threading.Lock:
+        """Lock for `key` so identical concurrent requests synthesize once.
+
+        Keys come from client uploads, so they share a fixed set of locks
+        instead of one lock per key (unrelated keys may occasionally wait on each other).
+        """
+        return self._locks[int(key[:8], 16) % len(self._locks)]
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def acquire(self, key: str) -> Optional[StoredOutput]:
+        """Look up `key` and pin it against eviction; call `release(key)` when done."""
+        with self._guard:
+            self._pins[key] += 1
+        meta_path = self._meta_path(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.release(key)
+            return None
+        path = meta_path.with_name(meta["blob"])
+        if not path.exists() or time.time() - meta["created"] > self.ttl_s:
+            self.release(key)
+            self._discard(key, meta_path, path)
+            return None
+        # Record the access for LRU eviction (atime is unreliable on noatime mounts)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return StoredOutput(key, path, meta["filename"], meta["created"])
+
+    def release(self, key: str) -> None:
+        with self._guard:
+            self._pins[key] -= 1
+            if self._pins[key] <= 0:
+                del self._pins[key]
+
+    def put(self, key: str, src: str | Path, filename: str) -> StoredOutput:
+        """Move `src` into the store (copying across devices) and evict as needed.
+
+        The new entry is returned pinned, like `acquire`, so it survives its own eviction pass.
+        """
+        src = Path(src)
+        bucket = self.root / key[:2]
+        bucket.mkdir(parents=True, exist_ok=True)
+        blob = bucket / f"{key}{src.suffix}"
+        try:
+            os.replace(src, blob)
+        except OSError:
+            copy_file(src, blob)
+            src.unlink(missing_ok=True)
+        created = blob.stat().st_mtime
+        meta = {"blob": blob.name, "filename": filename, "created": created, "size": blob.stat().st_size}
+        tmp = self._meta_path(key).with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        with self._guard:
+            self._pins[key] += 1
+        os.replace(tmp, self._meta_path(key))
+        self.evict()
+        return StoredOutput(key, blob, filename, created)
+
+    def evict(self) -> None:
+        if not self.root.exists():
+            return
+        now = time.time()
+        entries = []
+        for meta_path in self.root.glob("*/*.json"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                last_used = meta_path.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            blob = meta_path.with_name(meta.get("blob", ""))
+            if now - meta.get("created", 0) > self.ttl_s:
+                self._discard(meta_path.stem, meta_path, blob)
+                continue
+            entries.append((last_used, meta.get("size", 0), meta_path, blob))
+        total = sum(e[1] for e in entries)
+        for _, size, meta_path, blob in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if self._discard(meta_path.stem, meta_path, blob):
+                total -= size
+
+    def _discard(self, key: str, meta_path: Path, blob: Path) -> bool:
+        """Delete an entry unless it is pinned; returns whether it was deleted."""
+        with self._guard:
+            if self._pins[key] > 0:
+                return False
+            for p in (meta_path, blob):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            return True
+
+
+store = OutputStore(settings.store_dir, settings.store_ttl_s, settings.store_max_bytes)
+
+
+def synthesize_to_store(
+    upload: str | Path,
+    doc_sha256: str,
+    voice: Optional[str] = None,
+    temperature: Optional[float] = None,
+    repetition_penalty: Optional[float] = None,
+    max_chars: Optional[int] = None,
+    backend: Optional[str] = None,
+    audio_format: Optional[str] = None,
+    job: Optional["Job"] = None,
+    chunk_mode: Optional[str] = None,
+) -> tuple[StoredOutput, bool]:
+    """Return (stored output, cache_hit), synthesizing `upload` only on a miss.
+
+    The audio is rendered next to the upload (a per-request directory), then
+    moved into the store, so concurrent requests never share output paths.
+    The output is pinned: call `store.release(key)` once it has been served.
+    """
+    upload = Path(upload)
+    temperature = settings.temperature if temperature is None else temperature
+    repetition_penalty = settings.repetition_penalty if repetition_penalty is None else repetition_penalty
+    fmt = (audio_format or settings.audio_format).lower()
+    engine = OrpheusEngine.instance(force_backend=backend)
+    # Resolved here so a new calibration profile never serves audio chunked the old way
+    max_chars = resolve_max_chars(engine.backend, max_chars, chunk_mode)
+    key = output_key(doc_sha256, engine, voice, temperature, repetition_penalty, max_chars, fmt)
+    hit = store.acquire(key)
+    if hit is not None:
+        return hit, True
+    with store.lock(key):
+        hit = store.acquire(key)
+        if hit is not None:
+            return hit, True
+        out = synthesize_document(
+            upload,
+            out_wav=upload.parent / f"{upload.stem}.out.wav",
+            voice=voice,
+            temperature=temperature,
+            repetition_penalty=repetition_penalty,
+            max_chars=max_chars,
+            backend=backend,
+            audio_format=fmt,
+            job=job,
+        )
+        return store.put(key, out, filename=f"{upload.stem}{out.suffix}"), False
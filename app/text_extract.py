@@ -1,7 +1,12 @@
 from __future__ import annotations
 
 import re
+import zipfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import IO, Iterator
+
+from .tracing import span
 
 # Optional PDF support (PyMuPDF)
 try:
@@ -18,6 +23,17 @@ except Exception:  # pragma: no cover
 
 SUPPORTED_EXTS = {".pdf", ".docx", ".txt", ".md"}
 HARD_BREAK = "\n\n"
+# Page breaks survive normalization as a paragraph of their own (form feed)
+PAGE_BREAK = "\f"
+# Separator between page-break sections in normalized text
+SECTION_SEP = HARD_BREAK + PAGE_BREAK + HARD_BREAK
+_SENTENCE_END = (".", "!", "?", "…", ":", ";", "»", '"')
+
+# WordprocessingML namespaces used by the streaming DOCX reader
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+_DOCX_HEADER = re.compile(r"word/header\d*\.xml$")
+_DOCX_FOOTER = re.compile(r"word/footer\d*\.xml$")
 
 
 def normalize_text(text: str) -> str:
@@ -26,30 +42,159 @@ def normalize_text(text: str) -> str:
     - Removes CR (\r)
     - Joins word-hyphen-newline patterns (e.g., "com-\nplex" -> "complex")
     - Collapses single newlines within paragraphs; preserves blank lines as paragraph breaks
+    - Keeps form feeds (PAGE_BREAK) as standalone paragraphs for pause planning
     """
+    with span("normalize", cat="text", chars=len(text)):
+        return _normalize(text)
+
+
+def _normalize(text: str) -> str:
     text = text.replace("\r", "")
     # join hyphenated line breaks between alphanumerics
     text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
 
-    lines = [ln.strip() for ln in text.splitlines()]
     paragraphs: list[str] = []
-    buf: list[str] = []
-    for ln in lines:
-        if not ln:
-            if buf:
-                paragraphs.append(" ".join(buf))
-                buf = []
-        else:
-            buf.append(ln)
-    if buf:
-        paragraphs.append(" ".join(buf))
-
-    clean = HARD_BREAK.join(p.strip() for p in paragraphs if p.strip())
+    for page_no, page in enumerate(text.split(PAGE_BREAK)):
+        if page_no and paragraphs and paragraphs[-1] != PAGE_BREAK:
+            paragraphs.append(PAGE_BREAK)
+        buf: list[str] = []
+        for ln in (ln.strip() for ln in page.splitlines()):
+            if not ln:
+                if buf:
+                    paragraphs.append(" ".join(buf))
+                    buf = []
+            else:
+                buf.append(ln)
+        if buf:
+            paragraphs.append(" ".join(buf))
+
     # normalize multiple spaces
-    clean = re.sub(r"[ \t\f\v]+", " ", clean)
+    clean = HARD_BREAK.join(
+        p if p == PAGE_BREAK else re.sub(r"[ \t\f\v]+", " ", p.strip())
+        for p in paragraphs
+        if p == PAGE_BREAK or p.strip()
+    )
     return clean.strip()
 
 
+def _iter_wordml_paragraphs(fh: IO[bytes]) -> Iterator[str]:
+    """Yield paragraph text from one WordprocessingML part with incremental parsing.
+
+    Covers body paragraphs, table cells and text boxes (nested paragraphs);
+    skips mc:Fallback copies of text boxes and deleted/field-code text. Parsed
+    elements are dropped as soon as each top-level paragraph or table ends.
+    """
+    open_paras: list[list[str]] = []  # text boxes nest paragraphs inside runs
+    container = None
+    fallback_depth = 0
+    for event, el in ET.iterparse(fh, events=("start", "end")):
+        tag = el.tag
+        if event == "start":
+            if tag == _MC + "Fallback":
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == _W + "p":
+                open_paras.append([])
+            elif tag in (_W + "body", _W + "hdr", _W + "ftr"):
+                container = el
+            continue
+
+        if tag == _MC + "Fallback":
+            fallback_depth -= 1
+            continue
+        if fallback_depth:
+            continue
+        if open_paras:
+            if tag == _W + "t":
+                open_paras[-1].append(el.text or "")
+            elif tag == _W + "tab":
+                open_paras[-1].append("\t")
+            elif tag in (_W + "br", _W + "cr"):
+                open_paras[-1].append(PAGE_BREAK if el.get(_W + "type") == "page" else "\n")
+            elif tag == _W + "noBreakHyphen":
+                open_paras[-1].append("-")
+        if tag == _W + "p" and open_paras:
+            for i, text in enumerate("".join(open_paras.pop()).split(PAGE_BREAK)):
+                if i:
+                    yield PAGE_BREAK
+                if text.strip():
+                    yield text.strip()
+        if tag in (_W + "p", _W + "tbl") and not open_paras and container is not None:
+            container.clear()
+
+
+def iter_docx_paragraphs(path: str | Path) -> Iterator[str]:
+    """Stream paragraphs from a .docx without building a python-docx object model.
+
+    Order: headers, body (tables and text boxes included), footers. Identical
+    header/footer paragraphs (first/even/default variants) are read once.
+    """
+    with zipfile.ZipFile(Path(path)) as zf:
+        names = zf.namelist()
+        headers = sorted(n for n in names if _DOCX_HEADER.match(n))
+        footers = sorted(n for n in names if _DOCX_FOOTER.match(n))
+        seen: set[str] = set()
+        for part in [*headers, "word/document.xml", *footers]:
+            repeated = part != "word/document.xml"
+            with zf.open(part) as fh:
+                for text in _iter_wordml_paragraphs(fh):
+                    if repeated:
+                        if text in seen:
+                            continue
+                        seen.add(text)
+                    yield text
+
+
+def _iter_pdf_sections(p: Path) -> Iterator[str]:
+    if fitz is None:
+        raise RuntimeError("PyMuPDF is not installed. Install with: pip install pymupdf")
+    doc = fitz.open(p.as_posix())
+    pages: list[str] = []
+    for i, pg in enumerate(doc):
+        with span("pdf page", cat="extract", page=i + 1):
+            page_text = pg.get_text("text")
+        # Mark a page break only where the previous page ended a sentence,
+        # so paragraphs flowing across pages stay whole
+        if pages and pages[-1].rstrip().endswith(_SENTENCE_END):
+            section = normalize_text("\n".join(pages))
+            if section:
+                yield section
+            pages = []
+        pages.append(page_text)
+    if pages:
+        section = normalize_text("\n".join(pages))
+        if section:
+            yield section
+
+
+def pdf_page_count(path: str | Path) -> int:
+    """Number of pages, read from the PDF's page tree without extracting text."""
+    if fitz is None:
+        raise RuntimeError("PyMuPDF is not installed. Install with: pip install pymupdf")
+    with fitz.open(Path(path).as_posix()) as doc:
+        return doc.page_count
+
+
+def iter_sections(path: str | Path) -> Iterator[str]:
+    """Yield the normalized text of `path` one page-break section at a time.
+
+    PDFs are read page by page, so synthesis can start before the rest of the
+    document is extracted; other formats are extracted whole, then split.
+    `SECTION_SEP.join(iter_sections(path)) == extract_text(path)`.
+    """
+    p = Path(path)
+    ext = p.suffix.lower()
+    if ext not in SUPPORTED_EXTS:
+        raise ValueError(f"Unsupported extension: {ext}")
+    if ext == ".pdf":
+        yield from _iter_pdf_sections(p)
+        return
+    for section in extract_text(p).split(SECTION_SEP):
+        if section:
+            yield section
+
+
 def extract_text(path: str | Path) -> str:
     """Extract text from PDF/DOCX/TXT/MD and normalize it.
 
@@ -61,27 +206,31 @@ def extract_text(path: str | Path) -> str:
     ext = p.suffix.lower()
     if ext not in SUPPORTED_EXTS:
         raise ValueError(f"Unsupported extension: {ext}")
+    with span("extract", cat="text", file=p.name):
+        return _extract(p, ext)
 
+
+def _extract(p: Path, ext: str) -> str:
     if ext == ".pdf":
-        if fitz is None:
-            raise RuntimeError("PyMuPDF is not installed. Install with: pip install pymupdf")
-        doc = fitz.open(p.as_posix())
-        pages: list[str] = []
-        for pg in doc:
-            pages.append(pg.get_text("text"))
-        raw = "\n".join(pages)
-        return normalize_text(raw)
+        return SECTION_SEP.join(_iter_pdf_sections(p))
 
     if ext == ".docx":
-        if docx is None:
-            raise RuntimeError("python-docx is not installed. Install with: pip install python-docx")
-        d = docx.Document(p)
-        raw = "\n".join(par.text for par in d.paragraphs)
+        try:
+            with span("docx parse", cat="extract"):
+                raw = HARD_BREAK.join(iter_docx_paragraphs(p))
+        except (zipfile.BadZipFile, KeyError, ET.ParseError, UnicodeDecodeError) as e:
+            # Fallback: let python-docx try (e.g. unusual packaging)
+            print(f"[WARN] Streaming DOCX read failed ({e}). Falling back to python-docx...")
+            if docx is None:
+                raise RuntimeError("python-docx is not installed. Install with: pip install python-docx") from e
+            d = docx.Document(p)
+            raw = "\n".join(par.text for par in d.paragraphs)
         return normalize_text(raw)
 
     if ext in {".txt", ".md"}:
         # Use utf-8-sig to gracefully strip an optional BOM (\ufeff)
-        raw = p.read_text(encoding="utf-8-sig", errors="ignore")
+        with span("read", cat="extract"):
+            raw = p.read_text(encoding="utf-8-sig", errors="ignore")
         return normalize_text(raw)
 
     raise AssertionError("Unreachable: extension guard should return earlier")
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+# Timeline of one synthesis run in Chrome trace-event format (open the JSON in
+# Perfetto or chrome://tracing). Spans go to the tracer bound to the current
+# context; with none bound, `span()` costs one ContextVar lookup.
+# Each thread gets its own track; subprocesses (piper, ffmpeg) get a process
+# track of their own, keyed by their pid.
+
+
+class Tracer:
+    def __init__(self, name: str = "TTSDocReader"):
+        self.name = name
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self._t0 = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._named: set[tuple[int, int]] = set()
+        self._meta(self.pid, 0, "process_name", self.name)
+
+    def _ts(self, ns: int) -> float:
+        return (ns - self._t0) / 1000.0  # trace-event timestamps are microseconds
+
+    def _meta(self, pid: int, tid: int, kind: str, name: str) -> None:
+        self.events.append({"ph": "M", "name": kind, "pid": pid, "tid": tid, "args": {"name": name}})
+
+    def _track(self) -> tuple[int, int]:
+        th = threading.current_thread()
+        key = (self.pid, th.ident or 0)
+        if key not in self._named:
+            self._named.add(key)
+            self._meta(*key, "thread_name", th.name)
+        return key
+
+    def complete(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        cat: str = "",
+        args: Optional[dict] = None,
+        pid: Optional[int] = None,
+        process_name: Optional[str] = None,
+    ) -> None:
+        """Record a finished span; `pid` puts it on another process's track."""
+        with self._lock:
+            if pid is None:
+                pid, tid = self._track()
+            else:
+                tid = pid
+                if (pid, tid) not in self._named:
+                    self._named.add((pid, tid))
+                    self._meta(pid, 0, "process_name", process_name or name)
+            ev = {
+                "ph": "X",
+                "name": name,
+                "cat": cat,
+                "ts": self._ts(start_ns),
+                "dur": (end_ns - start_ns) / 1000.0,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                ev["args"] = args
+            self.events.append(ev)
+
+    def instant(self, name: str, cat: str = "", args: Optional[dict] = None) -> None:
+        with self._lock:
+            pid, tid = self._track()
+            ev = {"ph": "i", "s": "t", "name": name, "cat": cat, "ts": self._ts(time.perf_counter_ns()), "pid": pid, "tid": tid}
+            if args:
+                ev["args"] = args
+            self.events.append(ev)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> Path:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(self.to_dict()), encoding="utf-8")
+        return out
+
+
+_current: ContextVar[Optional[Tracer]] = ContextVar("tts_tracer", default=None)
+
+
+def current() -> Optional[Tracer]:
+    return _current.get()
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """Bind `tracer` to this context (threads started from here don't inherit it)."""
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, cat: str = "", **args) -> Iterator[Optional[dict]]:
+    """Record the enclosed block; yields the args dict so callers can add results."""
+    tracer = _current.get()
+    if tracer is None:
+        yield None
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield args
+    finally:
+        tracer.complete(name, start, time.perf_counter_ns(), cat, args)
+
+
+def run(
+    track: str,
+    cmd: Sequence[str],
+    input: Optional[bytes] = None,
+    check: bool = False,
+    **kwargs,
+) -> subprocess.CompletedProcess:
+    """`subprocess.run` equivalent that records the child on its own process track."""
+    start = time.perf_counter_ns()
+    with subprocess.Popen(cmd, stdin=subprocess.PIPE if input is not None else None, **kwargs) as proc:
+        try:
+            stdout, stderr = proc.communicate(input)
+        except BaseException:
+            proc.kill()
+            raise
+        returncode = proc.poll()
+    tracer = _current.get()
+    if tracer is not None:
+        tracer.complete(
+            track,
+            start,
+            time.perf_counter_ns(),
+            "subprocess",
+            {"cmd": Path(cmd[0]).name, "returncode": returncode},
+            pid=proc.pid,
+            process_name=f"{track} (pid {proc.pid})",
+        )
+    if check and returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, output=stdout, stderr=stderr)
+    return subprocess.CompletedProcess(cmd, returncode, stdout, stderr)
+
+
+def traced_iter(it, name: str, cat: str = "") -> Iterator:
+    """Yield from `it`, recording the time blocked in each `next()` as a span."""
+    tracer = _current.get()
+    if tracer is None:
+        yield from it
+        return
+    it = iter(it)
+    while True:
+        start = time.perf_counter_ns()
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        tracer.complete(name, start, time.perf_counter_ns(), cat)
+        yield item
@@ -1,19 +1,28 @@
 from __future__ import annotations
 
 import os
-import wave
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
+from . import resources, tracing
 from .config import settings
+from .mock_backend import mock_stream
+from .wav_assembly import WavAssembler, copy_file
 import subprocess
 import shutil
 import subprocess
 
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy as np
+
 # Force CPU by default unless explicitly overridden. Some builds try CUDA by default.
 os.environ.setdefault("SNAC_DEVICE", "cpu")
 os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+# Thread counts for OpenMP/BLAS/ORT must be in place before those libraries load
+resources.apply_process_env()
 
 # Optional backends
 IMPORT_ERROR: str | None = None
@@ -62,7 +71,9 @@ def _parler_is_available() -> bool:
 
 
 class OrpheusEngine:
-    _instance: Optional["OrpheusEngine"] = None
+    # One engine per requested backend so concurrent jobs don't evict each other
+    _instances: dict[str, "OrpheusEngine"] = {}
+    _instances_lock = threading.Lock()
 
     def __init__(self, model_name: str | None = None, force_backend: Optional[str] = None):
         self.model_name = model_name or settings.model_name
@@ -72,6 +83,8 @@ class OrpheusEngine:
         # Lazy caches for Parler
         self._parler_tok = None
         self._parler_model = None
+        self._parler_lock = threading.Lock()
+        self.parler_int8: bool = settings.parler_cpu_int8
 
         desired = self.desired_backend
         # Resolution d'ordre: explicit > auto with availability
@@ -100,6 +113,9 @@ class OrpheusEngine:
             self.backend = "pyttsx3" if _PYTTSX3_AVAILABLE else "mock"
         elif desired == "piper":
             self.backend = "piper" if _PIPER_AVAILABLE else ("pyttsx3" if _PYTTSX3_AVAILABLE else "mock")
+        elif desired == "mock":
+            # Silence with simulated timing (MOCK_PROFILE), for load tests
+            self.backend = "mock"
         elif desired == "parler":
             # Prefer Parler; if import later fails, caller will see a clear error
             self.backend = "parler"
@@ -127,9 +143,26 @@ class OrpheusEngine:
     @classmethod
     def instance(cls, model_name: str | None = None, force_backend: Optional[str] = None) -> "OrpheusEngine":
         desired = (force_backend or settings.tts_backend).lower()
-        if cls._instance is None or getattr(cls._instance, "desired_backend", None) != desired:
-            cls._instance = OrpheusEngine(model_name, force_backend=desired)
-        return cls._instance
+        with cls._instances_lock:
+            inst = cls._instances.get(desired)
+            if inst is None:
+                inst = cls._instances[desired] = OrpheusEngine(model_name, force_backend=desired)
+        return inst
+
+    def model_id(self, voice: Optional[str] = None) -> str:
+        """Identify the weights behind this engine (for cache keys)."""
+        if self.backend == "orpheus":
+            return self.model_name
+        if self.backend == "parler":
+            return settings.parler_model + (":int8" if self.parler_int8 else "")
+        if self.backend == "piper":
+            return "" if voice else (settings.piper_model or "")
+        return ""
+
+    def preload(self) -> None:
+        """Load model weights now instead of on the first synthesis call."""
+        if self.backend == "parler":
+            self._parler_load()
 
     def synth_stream(
         self,
@@ -137,12 +170,18 @@ class OrpheusEngine:
         voice: str | None = None,
         temperature: float | None = None,
         repetition_penalty: float | None = None,
+        cancel: Optional[threading.Event] = None,
     ):
         """Return generator of audio byte chunks for the given text.
 
         - orpheus: yields 16-bit PCM chunks at 24 kHz
-        - mock: yields silence chunks (24 kHz)
+        - parler: yields 16-bit PCM at the model's rate (see stream_sample_rate)
+        - mock: yields silence chunks (24 kHz), paced by MOCK_PROFILE
         - pyttsx3: not used here (non-streaming); use synthesize_to_wav instead
+
+        Closing the generator stops generation. Parler also checks `cancel`
+        between decoding steps, so a cancelled chunk stops while the model is
+        busy rather than at the next yielded frame.
         """
         if self.backend == "orpheus" and self.model is not None:
             return self.model.generate_speech(
@@ -154,18 +193,11 @@ class OrpheusEngine:
                 ),
             )
 
+        if self.backend == "parler":
+            return (pcm16_bytes(frames) for frames in self.parler_stream(text, voice=voice, cancel=cancel))
+
         # mock (silence) fallback
-        import math
-
-        duration_s = max(0.25, 0.25 * (len(text) / 80.0))
-        total_frames = int(24000 * duration_s)
-        chunk_frames = 2400  # 0.1s per chunk
-        silence_chunk = b"\x00\x00" * chunk_frames
-        emitted = 0
-        while emitted < total_frames:
-            yield silence_chunk
-            emitted += chunk_frames
-        return
+        return mock_stream(text)
 
     def synthesize_to_wav(self, text: str, out_path: str | Path, voice: Optional[str] = None) -> Path:
         """Synthesize to WAV file for non-streaming backends (pyttsx3 or piper).
@@ -180,7 +212,7 @@ class OrpheusEngine:
         # Use a temp file to avoid partial outputs, then move
         tmp_dir = Path(tempfile.gettempdir()) / "orpheus_tts_tmp"
         tmp_dir.mkdir(parents=True, exist_ok=True)
-        tmp_wav = tmp_dir / f"tts_{os.getpid()}_{abs(hash(text)) & 0xFFFF_FFFF}.wav"
+        tmp_wav = tmp_dir / f"tts_{os.getpid()}_{threading.get_ident()}_{abs(hash(text)) & 0xFFFF_FFFF}.wav"
 
         if self.backend == "pyttsx3":
             engine = pyttsx3.init()
@@ -214,51 +246,31 @@ class OrpheusEngine:
 
             cmd = [piper_bin, "-m", model_path.as_posix(), "-f", tmp_wav.as_posix()]
             try:
-                subprocess.run(cmd, input=text.encode("utf-8"), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                tracing.run(
+                    "piper",
+                    cmd,
+                    input=text.encode("utf-8"),
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=resources.subprocess_env(),
+                )
             except subprocess.CalledProcessError as e:
                 stderr = e.stderr.decode("utf-8", errors="ignore") if e.stderr else str(e)
                 raise RuntimeError(f"Piper synthesis failed: {stderr}") from e
         elif self.backend == "parler":
+            audio, sr = self.parler_generate_audio(text, voice=voice)
             try:
-                from transformers import AutoTokenizer  # type: ignore
-                from parler_tts import ParlerTTSForConditionalGeneration  # type: ignore
-            except Exception as e:
-                raise RuntimeError("Parler backend unavailable. Install optional deps: pip install -r requirements-parler.txt") from e
-            # Load model + tokenizer (weights cached by HF). Use CPU by default.
-            tok = AutoTokenizer.from_pretrained(settings.parler_model)
-            model = ParlerTTSForConditionalGeneration.from_pretrained(settings.parler_model)
-            desc = tok(text, return_tensors="pt")
-            desc_ids = desc["input_ids"]
-            style_prompt = (voice or settings.voice or "").strip() or "A clear, natural French voice with expressive, warm tone."
-            prompt = tok(style_prompt, return_tensors="pt")
-            prompt_ids = prompt["input_ids"]
-            import torch
-            with torch.no_grad():
-                gen = model.generate(
-                    desc_ids,
-                    attention_mask=desc.get("attention_mask"),
-                    prompt_input_ids=prompt_ids,
-                    prompt_attention_mask=prompt.get("attention_mask"),
-                )
-            # out is a FloatTensor of audio values or a ModelOutput with sequences=audio values
-            try:
-                import numpy as np  # type: ignore
-                if hasattr(gen, "sequences"):
-                    audio = gen.sequences.squeeze().cpu().float().numpy()
-                else:
-                    audio = gen.squeeze().cpu().float().numpy()
-                sr = int(getattr(model.audio_encoder.config, "sampling_rate", 24000))
                 import soundfile as sf  # type: ignore
-                sf.write(tmp_wav.as_posix(), audio if audio.ndim == 1 else audio[0], sr)
+                sf.write(tmp_wav.as_posix(), audio, sr)
             except Exception as e:
                 raise RuntimeError(f"Parler synthesis failed during decode/write: {e}") from e
 
         try:
             tmp_wav.replace(out)
         except Exception:
-            # Fallback to copy if replace fails across devices
-            data = Path(tmp_wav).read_bytes()
-            out.write_bytes(data)
+            # Fallback to an in-kernel copy if replace fails across devices
+            copy_file(tmp_wav, out)
             try:
                 Path(tmp_wav).unlink(missing_ok=True)
             except Exception:
@@ -267,6 +279,10 @@ class OrpheusEngine:
 
     # ---- Parler helpers (non-streaming, array output) ----
     def _parler_load(self):
+        with self._parler_lock:
+            return self._parler_load_locked()
+
+    def _parler_load_locked(self):
         if self._parler_tok is not None and self._parler_model is not None:
             return self._parler_tok, self._parler_model
         try:
@@ -274,80 +290,250 @@ class OrpheusEngine:
             from parler_tts import ParlerTTSForConditionalGeneration  # type: ignore
         except Exception as e:
             raise RuntimeError("Parler backend unavailable. Install optional deps: pip install -r requirements-parler.txt") from e
+        resources.configure_torch(settings.parler_threads or None)
         tok = AutoTokenizer.from_pretrained(settings.parler_model)
-        model = ParlerTTSForConditionalGeneration.from_pretrained(settings.parler_model)
+        if self.parler_int8:
+            model = self._parler_load_int8(ParlerTTSForConditionalGeneration)
+        else:
+            model = ParlerTTSForConditionalGeneration.from_pretrained(settings.parler_model)
+        model.eval()
         self._parler_tok, self._parler_model = tok, model
         return tok, model
 
-    def parler_generate_audio(self, text: str, voice: Optional[str] = None):
-        """Return (audio_float32_numpy, sample_rate) for given text using Parler."""
-        if self.backend != "parler":
-            raise RuntimeError("parler_generate_audio called but backend is not 'parler'")
+    def _parler_load_int8(self, model_cls):
+        """CPU mode: dynamic int8 quantization of Linear layers, cached on disk.
+
+        The quantized module is pickled whole (quantized weights can't be
+        restored via from_pretrained) and keyed by model id and torch version.
+        """
+        import torch
+
+        cache_dir = Path(settings.parler_cache_dir)
+        safe_id = settings.parler_model.replace("/", "--")
+        cached = cache_dir / f"{safe_id}-int8-torch{torch.__version__}.pt"
+        if cached.exists():
+            try:
+                return torch.load(cached.as_posix(), weights_only=False)
+            except Exception as e:
+                print(f"[WARN] Cached quantized Parler model unreadable ({e}); re-quantizing.")
+        model = model_cls.from_pretrained(settings.parler_model).eval()
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(".tmp")
+            torch.save(model, tmp.as_posix())
+            tmp.replace(cached)
+        except Exception as e:
+            print(f"[WARN] Could not cache quantized Parler model ({e}).")
+        return model
+
+    def _parler_inputs(self, text: str, voice: Optional[str]):
+        """Tokenize for Parler: the style prompt is the description, `text` is what gets spoken."""
         tok, model = self._parler_load()
-        desc = tok(text, return_tensors="pt")
         style_prompt = (voice or settings.voice or "").strip() or "A clear, natural French voice with expressive, warm tone."
-        prompt = tok(style_prompt, return_tensors="pt")
+        desc = tok(style_prompt, return_tensors="pt")
+        prompt = tok(text, return_tensors="pt")
+        kwargs = dict(
+            input_ids=desc["input_ids"],
+            attention_mask=desc.get("attention_mask"),
+            prompt_input_ids=prompt["input_ids"],
+            prompt_attention_mask=prompt.get("attention_mask"),
+        )
+        return model, kwargs
+
+    def parler_sample_rate(self) -> int:
+        _, model = self._parler_load()
+        return int(getattr(model.audio_encoder.config, "sampling_rate", 44100))
+
+    @staticmethod
+    def _parler_stopping(should_stop: Callable[[], bool]):
+        """StoppingCriteria list that ends `generate` once `should_stop()` is true."""
         import torch
-        with torch.no_grad():
-            gen = model.generate(
-                desc["input_ids"],
-                attention_mask=desc.get("attention_mask"),
-                prompt_input_ids=prompt["input_ids"],
-                prompt_attention_mask=prompt.get("attention_mask"),
-            )
+        from transformers import StoppingCriteria, StoppingCriteriaList  # type: ignore
+
+        class _EventStop(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return torch.full((input_ids.shape[0],), bool(should_stop()), dtype=torch.bool, device=input_ids.device)
+
+        return StoppingCriteriaList([_EventStop()])
+
+    def parler_stream(
+        self, text: str, voice: Optional[str] = None, cancel: Optional[threading.Event] = None
+    ) -> Iterator["np.ndarray"]:
+        """Yield float32 audio frames while Parler is still decoding `text`.
+
+        Generation runs on a helper thread feeding a ParlerTTSStreamer, which
+        decodes every PARLER_STREAM_STEP_S seconds of generated codes. It stops
+        at the next decoding step once `cancel` is set or the consumer closes
+        the generator, and the helper thread is joined before returning, so no
+        generation outlives the caller's worker slot.
+        """
+        if self.backend != "parler":
+            raise RuntimeError("parler_stream called but backend is not 'parler'")
+        model, kwargs = self._parler_inputs(text, voice)
+        import numpy as np  # type: ignore
+        import torch
+        from parler_tts import ParlerTTSStreamer  # type: ignore
+
+        frame_rate = getattr(model.audio_encoder.config, "frame_rate", 86)
+        play_steps = max(1, int(frame_rate * settings.parler_stream_step_s))
+        streamer = ParlerTTSStreamer(model, device=model.device, play_steps=play_steps)
+        closed = threading.Event()  # consumer went away
+        stopping = self._parler_stopping(lambda: closed.is_set() or (cancel is not None and cancel.is_set()))
+        failure: list[BaseException] = []
+
+        def generate() -> None:
+            try:
+                with torch.inference_mode():  # thread-local, so entered on this thread
+                    model.generate(**kwargs, streamer=streamer, stopping_criteria=stopping)
+            except BaseException as e:  # surfaced to the consumer below
+                failure.append(e)
+                streamer.on_finalized_audio(np.zeros(0, dtype=np.float32), stream_end=True)
+
+        worker = threading.Thread(target=generate, name="parler-generate", daemon=True)
+        worker.start()
+        try:
+            for frames in streamer:
+                if failure or len(frames) == 0:
+                    break
+                yield np.asarray(frames, dtype=np.float32).reshape(-1)
+        finally:
+            closed.set()
+            worker.join()
+        if failure:
+            raise RuntimeError(f"Parler streaming generation failed: {failure[0]}") from failure[0]
+
+    def stream_sample_rate(self) -> int:
+        """Sample rate of the PCM yielded by `synth_stream`."""
+        return self.parler_sample_rate() if self.backend == "parler" else 24000
+
+    def parler_generate_audio(self, text: str, voice: Optional[str] = None, cancel: Optional[threading.Event] = None):
+        """Return (audio_float32_numpy, sample_rate) for given text using Parler.
+
+        Setting `cancel` stops generation at the next decoding step (the
+        partial audio is returned; callers check the event themselves).
+        """
+        if self.backend != "parler":
+            raise RuntimeError("parler_generate_audio called but backend is not 'parler'")
+        model, kwargs = self._parler_inputs(text, voice)
+        import torch
+        if cancel is not None:
+            kwargs["stopping_criteria"] = self._parler_stopping(cancel.is_set)
+        with torch.inference_mode():
+            gen = model.generate(**kwargs)
         import numpy as np  # type: ignore
         if hasattr(gen, "sequences"):
             audio = gen.sequences.squeeze().cpu().float().numpy()
         else:
             audio = gen.squeeze().cpu().float().numpy()
-        sr = int(getattr(model.audio_encoder.config, "sampling_rate", 44100))
-        return audio.astype("float32", copy=False), sr
+        if audio.ndim > 1:
+            audio = audio[0]
+        return audio.astype("float32", copy=False), self.parler_sample_rate()
+
+
+def pcm16_bytes(audio: "np.ndarray") -> bytes:
+    """float32 samples in [-1, 1] -> little-endian 16-bit PCM."""
+    import numpy as np  # type: ignore
+
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
 
 
 def write_stream_to_wav(chunks: Iterable[bytes], out_path: str | Path, sample_rate: int = 24000) -> None:
-    out = Path(out_path)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    with wave.open(out.as_posix(), "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)  # 16-bit PCM
-        wf.setframerate(sample_rate)
+    with WavAssembler(out_path, framerate=sample_rate) as wav:  # 16-bit mono PCM
         for ch in chunks:
-            wf.writeframes(ch)
+            wav.append_pcm(ch)
+
+
+def find_ffmpeg() -> str:
+    """Resolve the ffmpeg executable from FFMPEG_BIN or PATH (best effort)."""
+    ffmpeg_bin = os.getenv("FFMPEG_BIN") or ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
+    if not Path(ffmpeg_bin).exists():
+        resolved = shutil.which(ffmpeg_bin)
+        if resolved:
+            ffmpeg_bin = resolved
+    return ffmpeg_bin
 
 
 def maybe_convert_to_mp3(wav_path: str | Path, audio_format: str | None = None) -> Path:
-    out = Path(wav_path)
     fmt = (audio_format or settings.audio_format).lower()
-    if fmt == "mp3":
-        # First try via pydub
-        try:
-            from pydub import AudioSegment  # type: ignore  # requires ffmpeg + (audioop/pyaudioop)
+    if fmt != "mp3":
+        return Path(wav_path)
+    with tracing.span("encode mp3", cat="encode"):
+        return _convert_to_mp3(Path(wav_path))
 
-            audio = AudioSegment.from_wav(out.as_posix())
+
+def _convert_to_mp3(out: Path) -> Path:
+    # First try via pydub
+    try:
+        from pydub import AudioSegment  # type: ignore  # requires ffmpeg + (audioop/pyaudioop)
+
+        audio = AudioSegment.from_wav(out.as_posix())
+        mp3_path = out.with_suffix(".mp3")
+        audio.export(mp3_path.as_posix(), format="mp3", bitrate="128k")
+        try:
+            out.unlink()
+        except Exception:
+            pass
+        return mp3_path
+    except Exception as e:  # pragma: no cover
+        print(f"[WARN] MP3 conversion via pydub failed ({e}). Trying ffmpeg CLI...")
+        # Fallback: try ffmpeg CLI directly
+        try:
+            ffmpeg_bin = find_ffmpeg()
             mp3_path = out.with_suffix(".mp3")
-            audio.export(mp3_path.as_posix(), format="mp3", bitrate="128k")
+            cmd = [ffmpeg_bin, "-y", "-i", out.as_posix(), "-b:a", "128k", mp3_path.as_posix()]
+            tracing.run("ffmpeg", cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             try:
                 out.unlink()
             except Exception:
                 pass
             return mp3_path
-        except Exception as e:  # pragma: no cover
-            print(f"[WARN] MP3 conversion via pydub failed ({e}). Trying ffmpeg CLI...")
-            # Fallback: try ffmpeg CLI directly
-            try:
-                ffmpeg_bin = os.getenv("FFMPEG_BIN") or ("ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-                if not Path(ffmpeg_bin).exists():
-                    resolved = shutil.which(ffmpeg_bin)
-                    if resolved:
-                        ffmpeg_bin = resolved
-                mp3_path = out.with_suffix(".mp3")
-                cmd = [ffmpeg_bin, "-y", "-i", out.as_posix(), "-b:a", "128k", mp3_path.as_posix()]
-                subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                try:
-                    out.unlink()
-                except Exception:
-                    pass
-                return mp3_path
-            except Exception as e2:
-                print(f"[WARN] MP3 conversion via ffmpeg CLI failed ({e2}). Keeping WAV.")
+        except Exception as e2:
+            print(f"[WARN] MP3 conversion via ffmpeg CLI failed ({e2}). Keeping WAV.")
     return out
+
+
+class Mp3Encoder:
+    """Encode 16-bit mono PCM to MP3 as it is produced (ffmpeg reading a pipe).
+
+    Lets the final MP3 be ready when synthesis ends instead of converting the
+    whole WAV afterwards. Raises OSError at construction if ffmpeg is missing.
+    """
+
+    def __init__(self, out_path: str | Path, sample_rate: int, bitrate: str = "128k"):
+        self.path = Path(out_path)
+        cmd = [
+            find_ffmpeg(), "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "s16le", "-ar", str(sample_rate), "-ac", "1", "-i", "pipe:0",
+            "-b:a", bitrate, self.path.as_posix(),
+        ]
+        self._started = time.perf_counter_ns()
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def write(self, pcm: bytes | memoryview) -> None:
+        assert self._proc.stdin is not None
+        self._proc.stdin.write(pcm)
+
+    def close(self) -> Path:
+        proc = self._proc
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+        except OSError:
+            pass
+        stderr = proc.stderr.read() if proc.stderr is not None else b""
+        returncode = proc.wait()
+        tracer = tracing.current()
+        if tracer is not None:
+            tracer.complete(
+                "ffmpeg", self._started, time.perf_counter_ns(), "subprocess",
+                {"cmd": "ffmpeg", "returncode": returncode}, pid=proc.pid, process_name=f"ffmpeg (pid {proc.pid})",
+            )
+        if returncode:
+            raise RuntimeError(f"ffmpeg MP3 encoding failed: {stderr.decode('utf-8', errors='ignore').strip()}")
+        return self.path
+
+    def abort(self) -> None:
+        self._proc.kill()
+        self._proc.wait()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Uploaded documents are copied to disk in fixed-size blocks (never read whole
+# into memory), hashed on the way for the output store, and capped at
+# MAX_UPLOAD_MB. Each request gets its own temp directory.
+#
+# Starlette's form parser has already spooled each file (in memory up to 1 MiB,
+# then to a temp file) by the time an endpoint runs, so large uploads are
+# written twice; the copy is what gets hashed. UploadLimitMiddleware bounds the
+# request body while it is received, whether or not it declares a Content-Length.
+
+_BLOCK = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeds MAX_UPLOAD_MB (mapped to HTTP 413)."""
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    sha256: str
+    size: int
+
+
+def max_upload_bytes() -> Optional[int]:
+    return settings.max_upload_mb * 1024 * 1024 if settings.max_upload_mb > 0 else None
+
+
+def request_limit(files: int = 1) -> Optional[int]:
+    """Most body bytes a request carrying up to `files` documents may send."""
+    limit = max_upload_bytes()
+    # Multipart framing and the other form fields add a little on top of the files
+    return None if limit is None else files * (limit + 64 * 1024)
+
+
+def check_content_length(header: Optional[str], files: int = 1) -> None:
+    """Reject before reading the body when the declared length is already too big.
+
+    `files` is the most documents the request may carry, each up to the limit.
+    """
+    limit = request_limit(files)
+    if limit is None or not header or not header.isdigit():
+        return
+    if int(header) > limit:
+        raise UploadTooLarge(f"Upload larger than {settings.max_upload_mb} MB")
+
+
+class UploadLimitMiddleware:
+    """Answer 413 to POST bodies over `request_limit` as soon as they cross it.
+
+    A declared Content-Length is checked before anything is read; otherwise
+    (chunked bodies) the bytes are counted as they arrive and the app sees a
+    disconnect once the limit is passed. `files_per_path` maps endpoints that
+    take several documents to their document count.
+    """
+
+    def __init__(self, app: ASGIApp, files_per_path: Optional[dict[str, int]] = None):
+        self.app = app
+        self.files_per_path = files_per_path or {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        files = self.files_per_path.get(scope["path"], 1)
+        limit = request_limit(files)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        try:
+            check_content_length(headers.get(b"content-length", b"").decode("latin-1"), files=files)
+        except UploadTooLarge as e:
+            await JSONResponse({"detail": str(e)}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded and not started:
+                return  # the app's answer to the cut-off body; 413 is sent below
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded or started:
+                raise
+        if exceeded and not started:
+            detail = f"Upload larger than {settings.max_upload_mb} MB"
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+
+
+def upload_dir(prefix: str = "tts_upload_") -> Path:
+    """Fresh per-request directory under UPLOAD_TMP_DIR (system temp if unset)."""
+    root = settings.upload_tmp_dir
+    if root:
+        Path(root).mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+
+
+def _copy(src: BinaryIO, dest: Path, limit: Optional[int]) -> SavedUpload:
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with dest.open("wb") as out:
+            while True:
+                block = src.read(_BLOCK)
+                if not block:
+                    break
+                size += len(block)
+                if limit is not None and size > limit:
+                    raise UploadTooLarge(f"Upload larger than {settings.max_upload_mb} MB")
+                digest.update(block)
+                out.write(block)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return SavedUpload(dest, digest.hexdigest(), size)
+
+
+async def save_upload(file: UploadFile, dest_dir: Path) -> SavedUpload:
+    """Stream `file` into `dest_dir` under its (sanitized) client filename."""
+    dest = dest_dir / (Path(file.filename or "").name or "upload")
+    try:
+        return await run_in_threadpool(_copy, file.file, dest, max_upload_bytes())
+    finally:
+        await file.close()
+
+
+def discard(path: Path) -> None:
+    shutil.rmtree(path, ignore_errors=True)
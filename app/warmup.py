@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from .config import settings
+from .pipeline import synthesize_text
+from .tts import OrpheusEngine
+
+# Startup phase for the web app: load every configured engine and run one short
+# synthesis per backend so imports, weights and JIT/graph warm-up are paid
+# before the instance reports ready.
+
+
+@dataclass
+class BackendReadiness:
+    backend: str  # requested name (e.g. "auto")
+    resolved: Optional[str] = None  # engine.backend after availability checks
+    status: str = "pending"  # pending | loading | warming | ready | error
+    load_s: Optional[float] = None
+    warmup_s: Optional[float] = None
+    error: Optional[str] = None
+
+
+def configured_backends() -> list[str]:
+    raw = settings.warmup_backends
+    if raw is None:
+        return [settings.tts_backend]
+    names = [b.strip().lower() for b in raw.split(",") if b.strip()]
+    return [] if names == ["none"] else names
+
+
+class Warmup:
+    def __init__(self, backends: list[str]):
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.states = {b: BackendReadiness(backend=b) for b in backends}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.finished is not None and all(s.status == "ready" for s in self.states.values())
+
+    def start(self) -> None:
+        """Warm up on a background thread so liveness answers immediately."""
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        for name, state in self.states.items():
+            try:
+                state.status = "loading"
+                t0 = time.perf_counter()
+                engine = OrpheusEngine.instance(force_backend=name)
+                engine.preload()
+                state.resolved = engine.backend
+                state.load_s = time.perf_counter() - t0
+
+                state.status = "warming"
+                t0 = time.perf_counter()
+                with tempfile.TemporaryDirectory(prefix="tts_warmup_") as tmp:
+                    synthesize_text(settings.warmup_text, Path(tmp) / "warmup.wav", backend=name, audio_format="wav")
+                state.warmup_s = time.perf_counter() - t0
+                state.status = "ready"
+                print(f"[INFO] Backend '{name}' ({engine.backend}) ready: load {state.load_s:.2f}s, warm-up {state.warmup_s:.2f}s")
+            except Exception as e:
+                traceback.print_exc()
+                state.status = "error"
+                state.error = str(e) or e.__class__.__name__
+                print(f"[WARN] Warm-up failed for backend '{name}': {state.error}")
+        self.finished = time.time()
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "started": self.started,
+            "finished": self.finished,
+            "backends": [asdict(s) for s in self.states.values()],
+        }
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+# Assemble PCM WAV files without routing sample data through Python objects.
+# WAV parts are spliced in-kernel (copy_file_range / sendfile, with an mmap
+# slice fallback) and the header is patched once at the end.
+
+WAV_HEADER_SIZE = 44
+_MAX_DATA_SIZE = 0xFFFF_FFFF - (WAV_HEADER_SIZE - 8)
+_COPY_BLOCK = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class WavLayout:
+    channels: int
+    sampwidth: int  # bytes per sample
+    framerate: int
+    data_offset: int  # byte offset of the PCM payload
+    data_size: int  # payload length in bytes
+
+    @property
+    def params(self) -> tuple[int, int, int]:
+        return self.channels, self.sampwidth, self.framerate
+
+    @property
+    def seconds(self) -> float:
+        return self.data_size / float(self.channels * self.sampwidth * self.framerate)
+
+
+def wav_header(channels: int, sampwidth: int, framerate: int, data_size: int) -> bytes:
+    """Return a canonical 44-byte PCM WAV header for `data_size` payload bytes."""
+    if data_size > _MAX_DATA_SIZE:
+        raise ValueError(f"WAV payload too large for RIFF: {data_size} bytes")
+    block_align = channels * sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        WAV_HEADER_SIZE - 8 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,  # PCM
+        channels,
+        framerate,
+        framerate * block_align,
+        block_align,
+        sampwidth * 8,
+        b"data",
+        data_size,
+    )
+
+
+def read_wav_layout(path: str | Path) -> WavLayout:
+    """Locate the fmt/data chunks of a PCM WAV file by walking its RIFF chunks.
+
+    Tolerates extra chunks (LIST, fact, ...) written by pyttsx3/Piper and
+    unfinalized data sizes (clamped to the file length).
+    """
+    p = Path(path)
+    file_size = p.stat().st_size
+    with p.open("rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise ValueError(f"Not a RIFF/WAVE file: {p}")
+        fmt: tuple[int, int, int] | None = None
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                raise ValueError(f"WAV file has no data chunk: {p}")
+            cid, size = struct.unpack("<4sI", head)
+            if cid == b"fmt ":
+                body = f.read(size)
+                tag, channels, framerate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag not in (1, 0xFFFE):
+                    raise ValueError(f"Unsupported WAV encoding (format tag {tag}): {p}")
+                fmt = (channels, bits // 8, framerate)
+                if size & 1:
+                    f.seek(1, os.SEEK_CUR)
+            elif cid == b"data":
+                if fmt is None:
+                    raise ValueError(f"WAV data chunk precedes fmt chunk: {p}")
+                offset = f.tell()
+                data_size = min(size, file_size - offset)
+                return WavLayout(*fmt, data_offset=offset, data_size=data_size)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def splice(src: BinaryIO, dst: BinaryIO, offset: int, count: int) -> None:
+    """Copy `count` bytes from `src` at `offset` to the current position of `dst`.
+
+    Uses copy_file_range, then sendfile, then an mmap slice, so the payload
+    never becomes a Python bytes object on platforms that support either call.
+    """
+    if count <= 0:
+        return
+    dst.flush()
+    in_fd, out_fd = src.fileno(), dst.fileno()
+    out_pos = os.lseek(out_fd, 0, os.SEEK_CUR)
+    remaining = count
+    src_pos = offset
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            while remaining:
+                n = os.copy_file_range(in_fd, out_fd, min(remaining, _COPY_BLOCK), src_pos, out_pos)
+                if n == 0:
+                    break
+                src_pos += n
+                out_pos += n
+                remaining -= n
+        except OSError:
+            pass  # e.g. EXDEV on older kernels / unsupported filesystems
+    if remaining and hasattr(os, "sendfile"):
+        try:
+            os.lseek(out_fd, out_pos, os.SEEK_SET)
+            while remaining:
+                n = os.sendfile(out_fd, in_fd, src_pos, min(remaining, _COPY_BLOCK))
+                if n == 0:
+                    break
+                src_pos += n
+                out_pos += n
+                remaining -= n
+        except OSError:
+            pass  # file-to-file sendfile is Linux-only
+    if remaining:
+        os.lseek(out_fd, out_pos, os.SEEK_SET)
+        with mmap.mmap(in_fd, 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                while remaining:
+                    n = min(remaining, _COPY_BLOCK)
+                    os.write(out_fd, view[src_pos : src_pos + n])
+                    src_pos += n
+                    out_pos += n
+                    remaining -= n
+            finally:
+                view.release()
+    if remaining:
+        raise OSError(f"Short copy: {remaining} of {count} bytes not written")
+    os.lseek(out_fd, out_pos, os.SEEK_SET)
+    dst.seek(out_pos)
+
+
+def copy_file(src: str | Path, dst: str | Path) -> Path:
+    """Copy a whole file using `splice` (used where os.replace can't cross devices)."""
+    out = Path(dst)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    size = Path(src).stat().st_size
+    with open(src, "rb") as fi, open(out, "wb") as fo:
+        splice(fi, fo, 0, size)
+    return out
+
+
+class WavAssembler:
+    """Incrementally build a mono/stereo PCM WAV from raw buffers and WAV parts.
+
+    `append_pcm` writes in-memory PCM (e.g. streamed model output);
+    `append_wav` splices another file's data section without reading it into
+    Python. The RIFF sizes are patched once on `close()`.
+    """
+
+    def __init__(self, out_path: str | Path, channels: int = 1, sampwidth: int = 2, framerate: int | None = None):
+        self.path = Path(out_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.channels = channels
+        self.sampwidth = sampwidth
+        self.framerate = framerate
+        self.data_size = 0
+        self._f: BinaryIO | None = open(self.path, "wb")
+        self._f.write(b"\x00" * WAV_HEADER_SIZE)
+
+    @property
+    def frames_written(self) -> int:
+        return self.data_size // (self.channels * self.sampwidth)
+
+    @property
+    def seconds_written(self) -> float:
+        return self.frames_written / float(self.framerate or 1)
+
+    def set_framerate(self, framerate: int) -> None:
+        if self.framerate is not None and self.framerate != framerate:
+            raise ValueError(f"Sample rate mismatch: {framerate} != {self.framerate}")
+        self.framerate = framerate
+
+    def append_pcm(self, pcm: bytes | bytearray | memoryview) -> None:
+        assert self._f is not None, "assembler is closed"
+        n = memoryview(pcm).nbytes  # len() counts items, not bytes, for typed buffers
+        self._check_room(n)
+        self._f.write(pcm)
+        self.data_size += n
+
+    def append_silence(self, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        if self.framerate is None:
+            raise ValueError("Sample rate must be set before writing silence")
+        frames = int(round(self.framerate * seconds))
+        remaining = frames * self.channels * self.sampwidth
+        block = bytes(min(remaining, 1 << 20))
+        while remaining:
+            n = min(remaining, len(block))
+            self.append_pcm(memoryview(block)[:n])
+            remaining -= n
+
+    def append_wav(self, part: str | Path) -> None:
+        assert self._f is not None, "assembler is closed"
+        layout = read_wav_layout(part)
+        if self.framerate is None:
+            self.framerate = layout.framerate
+        if layout.params != (self.channels, self.sampwidth, self.framerate):
+            raise ValueError(
+                f"Incompatible WAV part {part}: {layout.params} != "
+                f"{(self.channels, self.sampwidth, self.framerate)}"
+            )
+        self._check_room(layout.data_size)
+        with open(part, "rb") as src:
+            splice(src, self._f, layout.data_offset, layout.data_size)
+        self.data_size += layout.data_size
+
+    def close(self) -> Path:
+        if self._f is None:
+            return self.path
+        f, self._f = self._f, None
+        try:
+            f.seek(0)
+            f.write(wav_header(self.channels, self.sampwidth, self.framerate or 24000, self.data_size))
+        finally:
+            f.close()
+        return self.path
+
+    def _check_room(self, n: int) -> None:
+        if self.data_size + n > _MAX_DATA_SIZE:
+            raise ValueError("WAV output would exceed the 4 GiB RIFF limit")
+
+    def __enter__(self) -> "WavAssembler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from app.pipeline import synthesize_document
 from app.config import settings
+from app.tracing import Tracer, span, tracing
 
 
 def main():
@@ -15,7 +16,18 @@ def main():
     p.add_argument(
         "--repetition_penalty", type=float, default=settings.repetition_penalty
     )
-    p.add_argument("--max_chars", type=int, default=1500)
+    p.add_argument(
+        "--max_chars",
+        type=int,
+        default=None,
+        help="Chunk length; default: calibrated for the backend (scripts/calibrate_chunks.py), else 1500",
+    )
+    p.add_argument(
+        "--chunk_mode",
+        choices=["throughput", "latency", "fixed"],
+        default=settings.chunk_mode,
+        help="How the calibrated chunk length is chosen when --max_chars is not given",
+    )
     p.add_argument(
         "--audio_format",
         choices=["wav", "mp3"],
@@ -28,6 +40,12 @@ def main():
         default=settings.tts_backend,
         help="TTS backend to use (overrides .env)",
     )
+    p.add_argument(
+        "--trace",
+        metavar="OUT_JSON",
+        default=None,
+        help="Write a Chrome trace of the run (open in Perfetto / chrome://tracing)",
+    )
     args = p.parse_args()
 
     to_process: list[Path] = []
@@ -45,18 +63,24 @@ def main():
         print("No files to process.")
         return
 
-    for f in to_process:
-        print(f"-> {f}")
-        out = synthesize_document(
-            f,
-            voice=args.voice,
-            temperature=args.temperature,
-            repetition_penalty=args.repetition_penalty,
-            max_chars=args.max_chars,
-            backend=args.backend,
-            audio_format=args.audio_format,
-        )
-        print(f"   Output: {out}")
+    tracer = Tracer("cli") if args.trace else None
+    with tracing(tracer):
+        for f in to_process:
+            print(f"-> {f}")
+            with span("document", cat="run", file=str(f)):
+                out = synthesize_document(
+                    f,
+                    voice=args.voice,
+                    temperature=args.temperature,
+                    repetition_penalty=args.repetition_penalty,
+                    max_chars=args.max_chars,
+                    backend=args.backend,
+                    audio_format=args.audio_format,
+                    chunk_mode=args.chunk_mode,
+                )
+            print(f"   Output: {out}")
+    if tracer is not None:
+        print(f"Trace: {tracer.write(args.trace)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""Benchmark CPU Parler inference: fp32 vs dynamic int8.
+
+Reports real-time factor (synthesis seconds per audio second) and
+time-to-first-audio for whole-chunk vs streamed generation (PARLER_STREAM)
+for each mode, and how close the int8 output is to fp32 (log-spectrum cosine similarity and
+duration ratio). Generation samples, so both modes use the same seed per
+sentence; similarity is spectral rather than sample-exact.
+
+Usage:
+    python scripts/bench_parler_cpu.py [--threads 4] [--runs 2] [--voice "..."]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from app import resources  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.tts import OrpheusEngine  # noqa: E402
+
+CORPUS = [
+    "Bonjour, ceci est un test de synthèse vocale.",
+    "La lecture de documents longs demande une voix claire et régulière, sans pauses inattendues.",
+    "Les résultats du trimestre montrent une progression de douze pour cent par rapport à l'année précédente.",
+]
+
+
+def log_spectrum(audio: np.ndarray, n_fft: int = 1024, hop: int = 256) -> np.ndarray:
+    if len(audio) < n_fft:
+        audio = np.pad(audio, (0, n_fft - len(audio)))
+    frames = np.lib.stride_tricks.sliding_window_view(audio, n_fft)[::hop]
+    mag = np.abs(np.fft.rfft(frames * np.hanning(n_fft), axis=1))
+    return np.log1p(mag).mean(axis=0)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    sa, sb = log_spectrum(a), log_spectrum(b)
+    return float(np.dot(sa, sb) / (np.linalg.norm(sa) * np.linalg.norm(sb) + 1e-9))
+
+
+def first_audio_s(engine: OrpheusEngine, sentence: str, voice: str | None) -> float:
+    """Seconds until the streamed generator yields its first frames (then drained)."""
+    t0 = time.perf_counter()
+    frames = engine.parler_stream(sentence, voice=voice)
+    next(frames, None)
+    ttfa = time.perf_counter() - t0
+    for _ in frames:
+        pass
+    return ttfa
+
+
+def run_mode(int8: bool, runs: int, voice: str | None) -> tuple[list[np.ndarray], float, float, float, float]:
+    import torch
+
+    engine = OrpheusEngine(force_backend="parler")
+    engine.parler_int8 = int8
+    t0 = time.perf_counter()
+    engine.preload()
+    load_s = time.perf_counter() - t0
+    engine.parler_generate_audio("Bonjour.", voice=voice)  # warm-up
+
+    outputs: list[np.ndarray] = []
+    synth_s = audio_s = stream_ttfa = 0.0
+    calls = 0
+    for seed, sentence in enumerate(CORPUS):
+        for _ in range(runs):
+            torch.manual_seed(seed)
+            t0 = time.perf_counter()
+            audio, sr = engine.parler_generate_audio(sentence, voice=voice)
+            synth_s += time.perf_counter() - t0
+            audio_s += len(audio) / float(sr)
+            torch.manual_seed(seed)
+            stream_ttfa += first_audio_s(engine, sentence, voice)
+            calls += 1
+        outputs.append(audio)
+    # Without streaming, the first audio arrives with the whole chunk
+    return outputs, load_s, synth_s / max(audio_s, 1e-9), synth_s / calls, stream_ttfa / calls
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Parler CPU benchmark (fp32 vs int8)")
+    p.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = PARLER_THREADS / CPU budget share)")
+    p.add_argument("--runs", type=int, default=1, help="repetitions per sentence")
+    p.add_argument("--voice", default=None, help="Parler style prompt")
+    args = p.parse_args()
+
+    import torch
+
+    # Set through resources so the engine's own configure_torch call keeps it
+    resources.configure_torch(args.threads or settings.parler_threads or None)
+    print(f"torch {torch.__version__}, threads={torch.get_num_threads()}")
+
+    ref, load_fp32, rtf_fp32, ttfa_fp32, sttfa_fp32 = run_mode(False, args.runs, args.voice)
+    q, load_int8, rtf_int8, ttfa_int8, sttfa_int8 = run_mode(True, args.runs, args.voice)
+
+    print(f"{'mode':<6} {'load_s':>8} {'RTF':>8} {'TTFA_s':>8} {'TTFA_stream_s':>14}")
+    print(f"{'fp32':<6} {load_fp32:>8.2f} {rtf_fp32:>8.3f} {ttfa_fp32:>8.2f} {sttfa_fp32:>14.2f}")
+    print(
+        f"{'int8':<6} {load_int8:>8.2f} {rtf_int8:>8.3f} {ttfa_int8:>8.2f} {sttfa_int8:>14.2f}"
+        f"   speed-up x{rtf_fp32 / max(rtf_int8, 1e-9):.2f}"
+    )
+    print()
+    print(f"{'#':<3} {'spectral_sim':>12} {'duration_ratio':>15}")
+    for i, (a, b) in enumerate(zip(ref, q)):
+        print(f"{i:<3} {similarity(a, b):>12.4f} {len(b) / max(len(a), 1):>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Calibrate chunk sizes per TTS backend on this machine.
+
+Synthesizes a fixed corpus at several chunk lengths with each installed
+backend, fits seconds = overhead + per_char * chars, and stores the profile in
+CALIBRATION_FILE (default outputs/chunk_profiles.json). The pipeline then
+sizes chunks from it whenever max_chars is not given: CHUNK_MODE=throughput
+for the lowest total time, latency for the fastest first audio.
+
+Usage:
+    python scripts/calibrate_chunks.py [--backends orpheus,parler] [--lengths 100,200,400,800,1500] [--runs 2]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.calibration import CALIBRATION_LENGTHS, calibrate, load_profiles, save_profiles  # noqa: E402
+from app.tts import OrpheusEngine  # noqa: E402
+
+BACKENDS = ("orpheus", "parler", "piper", "pyttsx3")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Fit per-backend chunk-size profiles")
+    ap.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends to calibrate")
+    ap.add_argument("--lengths", default=",".join(str(n) for n in CALIBRATION_LENGTHS), help="Chunk lengths (chars)")
+    ap.add_argument("--runs", type=int, default=2, help="Timed runs per length")
+    ap.add_argument("--voice", default=None)
+    ap.add_argument("--out", default=None, help="Profile file (default CALIBRATION_FILE)")
+    args = ap.parse_args()
+
+    lengths = tuple(sorted({int(x) for x in args.lengths.split(",") if x.strip()}))
+    profiles = load_profiles(args.out)
+    for name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        engine = OrpheusEngine(force_backend=name)
+        if engine.backend != name:
+            print(f"[WARN] {name} is not installed (would fall back to {engine.backend}); skipped")
+            continue
+        print(f"[INFO] Calibrating {name}...")
+        try:
+            profile = calibrate(engine, lengths=lengths, runs=args.runs, voice=args.voice)
+        except Exception as e:
+            print(f"[WARN] Calibration of {name} failed: {e}")
+            continue
+        profiles[name] = profile
+        print(
+            f"  overhead {profile.overhead_s:.3f} s + {profile.per_char_s * 1000:.3f} ms/char"
+            f" -> max_chars throughput={profile.choose('throughput')} latency={profile.choose('latency')}"
+        )
+
+    if profiles:
+        print(f"Profiles: {save_profiles(profiles, args.out)}")
+    else:
+        print("No backend calibrated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Load-test the web app's /synthesize endpoint at several concurrency levels.
+
+Each virtual user uploads a generated text document (unique per request, so
+the output store never answers from cache unless --allow-cache) and waits for
+the audio. Reports throughput and p50/p95/p99 latency per level.
+
+Without --url the app runs in-process (ASGI transport, same event loop) with
+the mock backend; pick its timing with --profile (see app/mock_backend.py).
+With --url the requests go to a running server over HTTP; the server's own
+TTS_BACKEND / MOCK_PROFILE settings apply. Virtual users identify themselves
+with X-Client-Id, which the server only honours from TRUSTED_PROXIES, so add
+the load generator's address there to get one fair-share key per user.
+
+Usage:
+    python scripts/loadtest.py [--concurrency 1,2,4,8] [--requests 16] [--profile orpheus]
+    python scripts/loadtest.py --url http://127.0.0.1:8000 --backend mock
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    sys.exit("httpx is required for the load test: pip install httpx")
+
+SENTENCES = [
+    "La lecture de documents longs demande une voix claire et régulière.",
+    "Les résultats du trimestre montrent une progression de douze pour cent.",
+    "Chaque paragraphe est découpé en blocs avant la synthèse.",
+    "Le serveur répartit les blocs entre les clients de manière équitable.",
+]
+
+
+def make_document(chars: int, nonce: str) -> bytes:
+    paras: list[str] = [f"Document {nonce}."]
+    size = 0
+    i = 0
+    while size < chars:
+        para = " ".join(SENTENCES[(i + k) % len(SENTENCES)] for k in range(3))
+        paras.append(para)
+        size += len(para)
+        i += 1
+    return "\n\n".join(paras).encode("utf-8")
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(-(-pct * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def wav_seconds(body: bytes) -> float:
+    # Canonical 44-byte header written by WavAssembler: 16-bit mono
+    if len(body) < 44 or body[:4] != b"RIFF":
+        return 0.0
+    rate = int.from_bytes(body[24:28], "little")
+    return (len(body) - 44) / float(2 * rate) if rate else 0.0
+
+
+async def run_level(client: httpx.AsyncClient, args: argparse.Namespace, concurrency: int) -> dict:
+    total = args.requests or 4 * concurrency
+    latencies: list[float] = []
+    errors: list[str] = []
+    audio_s = 0.0
+    issued = 0
+
+    async def user(uid: int) -> None:
+        nonlocal issued, audio_s
+        while issued < total:
+            issued += 1
+            nonce = "fixe" if args.allow_cache else uuid.uuid4().hex[:12]
+            doc = make_document(args.chars, nonce)
+            t0 = time.perf_counter()
+            try:
+                r = await client.post(
+                    "/synthesize",
+                    files={"file": (f"load-{nonce}.txt", doc, "text/plain")},
+                    data={"backend": args.backend, "audio_format": "wav", "max_chars": str(args.max_chars)},
+                    headers={"X-Client-Id": f"loadtest-{uid}"},
+                )
+            except httpx.HTTPError as e:
+                errors.append(e.__class__.__name__)
+                continue
+            elapsed = time.perf_counter() - t0
+            if r.status_code != 200:
+                errors.append(str(r.status_code))
+                continue
+            latencies.append(elapsed)
+            audio_s += wav_seconds(r.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else None,
+        "audio_s_per_s": round(audio_s / wall, 3) if wall else None,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "max_s": max(latencies) if latencies else None,
+    }
+
+
+def print_table(rows: list[dict]) -> None:
+    fmt = "{:>5} {:>6} {:>5} {:>8} {:>8} {:>9} {:>8} {:>8} {:>8}"
+    print(fmt.format("conc", "ok", "err", "req/s", "audio/s", "p50", "p95", "p99", "max"))
+
+    def s(v: float | None) -> str:
+        return "-" if v is None else f"{v:.3f}"
+
+    for r in rows:
+        print(
+            fmt.format(
+                r["concurrency"], r["ok"], r["errors"], s(r["throughput_rps"]), s(r["audio_s_per_s"]),
+                s(r["p50_s"]), s(r["p95_s"]), s(r["p99_s"]), s(r["max_s"]),
+            )
+        )
+
+
+async def main_async(args: argparse.Namespace) -> list[dict]:
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+    timeout = httpx.Timeout(args.timeout)
+    rows: list[dict] = []
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            for c in levels:
+                rows.append(await run_level(client, args, c))
+        return rows
+
+    # In-process: settings are read at import time, so configure before importing the app
+    os.environ["MOCK_PROFILE"] = args.profile
+    os.environ.setdefault("TTS_BACKEND", args.backend)
+    os.environ.setdefault("WARMUP_BACKENDS", "none")
+    # ASGITransport's peer address, so each virtual user's X-Client-Id is honoured
+    os.environ.setdefault("TRUSTED_PROXIES", "127.0.0.1")
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            for c in levels:
+                rows.append(await run_level(client, args, c))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Concurrent upload load test for /synthesize")
+    ap.add_argument("--url", default=None, help="Server base URL; omit to run the app in-process")
+    ap.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    ap.add_argument("--requests", type=int, default=0, help="Requests per level (default 4 x concurrency)")
+    ap.add_argument("--chars", type=int, default=1200, help="Approximate characters per document")
+    ap.add_argument("--max_chars", type=int, default=1500)
+    ap.add_argument("--backend", default="mock")
+    ap.add_argument("--profile", default="orpheus", help="Mock timing preset for in-process runs")
+    ap.add_argument("--allow-cache", action="store_true", help="Send identical documents (store hits)")
+    ap.add_argument("--timeout", type=float, default=600.0)
+    ap.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = ap.parse_args()
+
+    rows = asyncio.run(main_async(args))
+    print_table(rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from app.chunking import PAGE_BREAK, is_standalone_heading, iter_blocks, iter_plan_chunks, plan_chunks
+
+BODY = "Ceci est un paragraphe de corps, assez long pour ne jamais passer pour un titre de section."
+
+
+def test_list_items_are_merged_up_to_min_chars():
+    text = "\n\n".join(["Pommes", "Poires", "Lait", "Pain", "Beurre", "Farine", "Sucre", "Oeufs"])
+    plan = plan_chunks(text, min_chars=30, heading_pause_s=0.7, paragraph_pause_s=0.4)
+    assert [c.text for c in plan] == [
+        "Pommes. Poires. Lait. Pain. Beurre.",
+        "Farine. Sucre. Oeufs.",
+    ]
+    assert [c.pause_s for c in plan] == [0.4, 0.0]
+
+
+def test_shopping_and_numbered_lists_do_not_become_headings():
+    items = ["Pommes", "Poires", "Lait", "Pain", "Beurre", "1) Préchauffer le four", "2) Mélanger", "3) Cuire"]
+    text = "\n\n".join(items + [BODY])
+    plan = plan_chunks(text, min_chars=200)
+    assert len(plan) == 1
+    assert plan[0].text.startswith("Pommes. Poires.")
+
+
+def test_isolated_short_line_is_a_heading():
+    text = "\n\n".join(["Introduction", BODY, "Méthodes", BODY])
+    plan = plan_chunks(text, min_chars=20, heading_pause_s=0.7, paragraph_pause_s=0.4)
+    assert [c.text for c in plan] == ["Introduction.", BODY, "Méthodes.", BODY]
+    # The body before "Méthodes" gets the heading pause, the headings themselves a paragraph pause
+    assert [c.pause_s for c in plan] == [0.4, 0.7, 0.4, 0.0]
+
+
+def test_heading_detection_looks_at_neighbours():
+    assert is_standalone_heading(None, "Titre", BODY)
+    assert is_standalone_heading(PAGE_BREAK, "Titre", BODY)
+    assert not is_standalone_heading("Pommes", "Poires", BODY)
+    assert not is_standalone_heading(BODY, "Pommes", "Poires")
+    assert not is_standalone_heading(None, BODY, None)
+
+
+def test_short_paragraphs_are_merged():
+    plan = plan_chunks("Un.\n\nDeux.\n\nTrois.", min_chars=200)
+    assert [c.text for c in plan] == ["Un. Deux. Trois."]
+    assert plan[-1].pause_s == 0.0
+
+
+def test_page_break_pause_between_sections():
+    plan = list(iter_plan_chunks(iter_blocks(["Premier paragraphe.", "Second paragraphe."]), min_chars=5, page_pause_s=1.0))
+    assert [c.text for c in plan] == ["Premier paragraphe.", "Second paragraphe."]
+    assert [c.pause_s for c in plan] == [1.0, 0.0]
+
+
+def test_long_paragraph_is_split_by_sentences():
+    para = " ".join(f"Phrase numéro {i} du paragraphe." for i in range(20))
+    plan = plan_chunks(para, max_chars=100)
+    assert all(len(c.text) <= 100 for c in plan)
+    assert " ".join(c.text for c in plan) == para